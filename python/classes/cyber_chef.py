@@ -31,6 +31,9 @@
     
     urlencode = Recipes.get('urlencoded').wrap()
     encode_data_for_http_request = Recipes.get('to_urlencoded_b64_string').wrap()
+    
+    # hot paths: bind args and kwargs once, no per-step dispatch on each call
+    hash_string = Recipes.get('hash_string').compile()
     ...
 
 
@@ -62,12 +65,78 @@
     s1 == decrypt_string_with_secret_key(encrypted, secret_key)
 
     ...    
+
+
+  ----
+  
+  
+  EG 4 offload cpu heavy ingredients from an event loop
+    from concurrent.futures import ProcessPoolExecutor
+    from .auxiliary.cyber_chef import Recipe
+    
+    derive_key = Recipe("derive_key", "str_to_bytes", "derive_key_pbkdf2_sha512")
+    
+    async def derive_keys(passwords):
+      with ProcessPoolExecutor() as pool:
+        return await derive_key.acook_many(passwords, pool, limit=8)
+
+    ...    
 """
 
+import asyncio
 from urllib.parse import quote as urlencode, unquote as urldecode
 from json import dumps as json_dumps, loads as json_loads
 from base64 import b64encode, b64decode
-from typing import Callable, Optional
+from binascii import a2b_base64, b2a_base64
+from collections import OrderedDict
+from concurrent.futures import Executor
+from copy import deepcopy
+from functools import partial
+from hashlib import sha256
+from itertools import islice
+from os import urandom
+from threading import Lock
+from time import monotonic, perf_counter_ns
+from typing import Callable, Iterable, Optional
+
+def _as_buffer(v) -> Optional[memoryview]:
+  """
+  Byte view over any buffer-protocol object (bytearray, memoryview, mmap, array...)
+  or None if :param v: doesn't support the protocol
+  """
+  try:
+    return memoryview(v).cast('B')
+  except TypeError:
+    return None
+
+def _as_octets(v) -> Optional[memoryview]:
+  """
+  Byte view over a buffer of octets (bytes, bytearray, array('B')...) or None
+  if :param v: isn't one: typed arrays of wider items hold ints, not octets
+  """
+  try:
+    view = memoryview(v)
+  except TypeError:
+    return None
+  if view.itemsize != 1 or view.format not in ('B', 'c'):
+    view.release()
+    return None
+  try:
+    return view.cast('B')
+  except TypeError:
+    return None
+
+def _write_into(out, data) -> memoryview:
+  """
+  Copy :param data: at the start of the caller-supplied buffer :param out:
+  and return a view over the written bytes (release it to resize :param out:)
+  """
+  view = memoryview(out).cast('B')
+  data = memoryview(data).cast('B')
+  if data.nbytes > view.nbytes:
+    raise ValueError(f"Output buffer too small ({view.nbytes} < {data.nbytes} bytes)")
+  view[:data.nbytes] = data
+  return view[:data.nbytes]
 
 def cast_to_str(v, encoding = 'utf8'):
   if isinstance(v, str):
@@ -76,23 +145,35 @@ def cast_to_str(v, encoding = 'utf8'):
     return str(v)
   if isinstance(v, bool):
     return "true" if v else "false"
-  if isinstance(v, bytes):
-    return v.decode(encoding)
+  if isinstance(v, bytes) or _as_buffer(v) is not None:
+    return str(v, encoding)
   raise ValueError(f"Cannot cast type {v.__class__.__name__} into string")
   
-def cast_to_bytes(v, encoding = 'utf8') -> bytes:
+def cast_to_bytes(v, encoding = 'utf8', copy: bool = True) -> bytes:
+  """
+  Buffer-protocol objects are copied into bytes,
+  or returned as a memoryview if not :param copy:
+  """
+  if isinstance(v, bytes):
+    return v
   if isinstance(v, str):
     return v.encode(encoding)
   if isinstance(v, (int, float)):
     return str(v).encode(encoding)
   if isinstance(v, bool):
     return "true".encode(encoding) if v else "false".encode(encoding)
-  if isinstance(v, bytes):
-    return v
+  view = _as_buffer(v)
+  if view is not None:
+    return bytes(view) if copy else view
   raise ValueError(f"Cannot cast type {v.__class__.__name__} into bytes")
 
-def hex_to_bytes(h: str) -> bytes:
-  return bytes.fromhex(h)
+def hex_to_bytes(h: str, out = None) -> bytes:
+  """
+  :param h: can be a str or an ascii buffer (eg a memory-mapped hex dump),
+  with :param out: the bytes are written into that buffer and a view is returned
+  """
+  b = bytes.fromhex(h if isinstance(h, str) else str(h, 'ascii'))
+  return b if out is None else _write_into(out, b)
 
 def bytes_to_hex(
     b: bytes, 
@@ -100,21 +181,30 @@ def bytes_to_hex(
     bytes_per_block: Optional[int] = None,
     upper: bool = False
   ) -> str:
+  hexed = b.hex if isinstance(b, (bytes, bytearray)) else memoryview(b).cast('B').hex
   if sep is None:
-    ret = b.hex()
+    ret = hexed()
   else:
-    ret = b.hex(
+    ret = hexed(
       sep,
       # negative values separe from left to right
       bytes_per_block * -1 if bytes_per_block else 0
     )
   return ret.upper() if upper else ret
 
+def bytes_to_b64(b: bytes, altchars: Optional[bytes] = None, out = None) -> bytes:
+  """
+  Like base64.b64encode, accepting any buffer and optionally
+  writing into the :param out: buffer (a view is returned)
+  """
+  e = b2a_base64(b, newline=False) if altchars is None else b64encode(b, altchars)
+  return e if out is None else _write_into(out, e)
+
 def str_to_bytes(s: str, encoding = 'utf8') -> bytes:
   return s.encode(encoding)
 
 def bytes_to_str(b: bytes, encoding = 'utf8') -> str:
-  return b.decode(encoding)
+  return str(b, encoding)
 
 def int_to_octet(i: int) -> str:
   if any((i > 255, i < 0)):
@@ -131,10 +221,59 @@ def octet_to_int(o: str) -> int:
   return ret
 
 def bytes_to_ints(b: bytes) -> [int]:
-  return [int(b_) for b_ in b]
+  with memoryview(b) as view, view.cast('B') as octets:
+    return octets.tolist()
+
+def ints_to_bytes(ints: [int], out = None) -> bytes:
+  """
+  With :param out: the bytes are written into that buffer and a view is returned,
+  byte buffers (eg array('B')) are copied without intermediate objects
+  """
+  view = _as_octets(ints)
+  b = view if view is not None else bytes(list(ints))
+  if out is None:
+    return bytes(b)
+  return _write_into(out, b)
+
+# batch implementations: take a list of values and return a list of results
+def bytes_to_b64_many(bs: [bytes], altchars: Optional[bytes] = None) -> [bytes]:
+  if altchars is not None:
+    return [b64encode(b, altchars) for b in bs]
+  return [b2a_base64(b, newline=False) for b in bs]
 
-def ints_to_bytes(ints: [int]) -> bytes:
-  return b''.join([i.to_bytes(1, 'big') for i in ints])
+def b64_to_bytes_many(ss: [bytes], altchars: Optional[bytes] = None, validate: bool = False) -> [bytes]:
+  if altchars is not None or validate:
+    return [b64decode(s, altchars, validate) for s in ss]
+  return [a2b_base64(s) for s in ss]
+
+def hex_to_bytes_many(hs: [str]) -> [bytes]:
+  return list(map(hex_to_bytes, hs))
+
+def bytes_to_hex_many(
+    bs: [bytes], 
+    sep: Optional[str] = None, 
+    bytes_per_block: Optional[int] = None,
+    upper: bool = False
+  ) -> [str]:
+  if sep is not None:
+    return [bytes_to_hex(b, sep, bytes_per_block, upper) for b in bs]
+  hexed = [
+    b.hex() if isinstance(b, (bytes, bytearray)) else memoryview(b).cast('B').hex() 
+    for b in bs
+  ]
+  return [h.upper() for h in hexed] if upper else hexed
+
+def str_to_bytes_many(ss: [str], encoding = 'utf8') -> [bytes]:
+  return [s.encode(encoding) for s in ss]
+
+def bytes_to_str_many(bs: [bytes], encoding = 'utf8') -> [str]:
+  return [str(b, encoding) for b in bs]
+
+def bytes_to_ints_many(bs: [bytes]) -> [[int]]:
+  return [memoryview(b).cast('B').tolist() for b in bs]
+
+def ints_to_bytes_many(ints_list: [[int]]) -> [bytes]:
+  return list(map(ints_to_bytes, ints_list))
 
 def hash_keccak(b: bytes, digest_bits: int=256) -> bytes:
   from Crypto.Hash import keccak
@@ -210,6 +349,16 @@ def password_check_bcrypt(
   except ValueError:
     return False
 
+def _check_aes256_gcm_params(key, nonce, mac_tag_length):
+  if not len(key) in [16, 24, 32]:
+    raise ValueError("AES256 GCM work only keys of (16, 24 or 32) bytes")
+
+  if nonce is not None and len(nonce) < 12:
+    raise ValueError("AES256 GCM nonce must be at least 12 bytes long")
+
+  if mac_tag_length < 4 or mac_tag_length > 16:
+    raise ValueError("AES256 GCM mac tag length must be between 4 and 16 bytes long")
+
 def encrypt_aes256_gcm(
     data: bytes,
     key: bytes,
@@ -220,14 +369,7 @@ def encrypt_aes256_gcm(
   from Crypto.Cipher import AES
   from Crypto.Random import get_random_bytes
 
-  if not len(key) in [16, 24, 32]:
-    raise ValueError("AES256 GCM work only keys of (16, 24 or 32) bytes")
-
-  if nonce is not None and len(nonce) < 12:
-    raise ValueError("AES256 GCM nonce must be at least 12 bytes long")
-
-  if mac_tag_length < 4 or mac_tag_length > 16:
-    raise ValueError("AES256 GCM mac tag length must be between 4 and 16 bytes long")
+  _check_aes256_gcm_params(key, nonce, mac_tag_length)
 
   cipher = AES.new(
     key, 
@@ -263,27 +405,379 @@ def decrypt_aes256_gcm(
   except (ValueError, KeyError) as e:
     raise e
 
+class Aes256Gcm:
+  """
+  AES GCM bound to a key, for hot paths encrypting many values with the same key.
+  The key is validated once and, when the `cryptography` package is installed,
+  expanded once into its AESGCM object (pycryptodome is the fallback and 
+  it's imported once).
+
+  envelope="dict" gives the same output of encrypt_aes256_gcm
+  envelope="binary" gives compact nonce|ciphertext|tag bytes, the same layout
+  of encrypt_aes256_gcm_stream, the header is not included
+
+    aes = Aes256Gcm(secret_key, envelope="binary")
+    encrypt_token = Recipe("encrypt_token", "str_to_bytes", aes.encryptor()).compile()
+    decrypt_token = Recipe("decrypt_token", aes.decryptor(), "bytes_to_str").compile()
+  """
+  def __init__(
+      self,
+      key: bytes,
+      mac_tag_length: int = 16,
+      nonce_length: int = 12,
+      envelope: str = "dict"
+    ):
+    _check_aes256_gcm_params(key, None, mac_tag_length)
+    if nonce_length < 12:
+      raise ValueError("AES256 GCM nonce must be at least 12 bytes long")
+    if envelope not in ("dict", "binary"):
+      raise ValueError("AES256 GCM envelope must be 'dict' or 'binary'")
+    self.key = key
+    self.mac_tag_length = mac_tag_length
+    self.nonce_length = nonce_length
+    self.envelope = envelope
+    self._aead = None
+    if mac_tag_length == 16:
+      try:
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        self._aead = AESGCM(key)
+      except ImportError:
+        pass
+    if self._aead is None:
+      from Crypto.Cipher import AES
+      self._new = partial(AES.new, key, AES.MODE_GCM, mac_len=mac_tag_length)
+
+  def __reduce__(self):
+    # rebuild from the key, the expanded key objects can't be pickled
+    return (
+      Aes256Gcm, 
+      (self.key, self.mac_tag_length, self.nonce_length, self.envelope)
+    )
+
+  def _seal(self, data: bytes, header: bytes, nonce: Optional[bytes]) -> tuple:
+    if nonce is None:
+      nonce = urandom(self.nonce_length)
+    elif len(nonce) < 12:
+      raise ValueError("AES256 GCM nonce must be at least 12 bytes long")
+    if self._aead is not None:
+      sealed = self._aead.encrypt(nonce, data, header or None)
+      return nonce, sealed[:-16], sealed[-16:]
+    cipher = self._new(nonce=nonce)
+    cipher.update(header)
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return nonce, ciphertext, tag
+
+  def _open(self, nonce: bytes, ciphertext: bytes, tag: bytes, header: bytes) -> bytes:
+    if self._aead is not None:
+      from cryptography.exceptions import InvalidTag
+      try:
+        return self._aead.decrypt(nonce, b''.join((ciphertext, tag)), header or None)
+      except InvalidTag:
+        raise ValueError("MAC check failed")
+    cipher = self._new(nonce=nonce)
+    cipher.update(header)
+    return cipher.decrypt_and_verify(ciphertext, tag)
+
+  def encrypt(self, data: bytes, header: bytes = b'', nonce: Optional[bytes] = None):
+    nonce, ciphertext, tag = self._seal(data, header, nonce)
+    if self.envelope == "binary":
+      return b''.join((nonce, ciphertext, tag))
+    return {
+      k: b64encode(v).decode('utf-8')
+      for k, v in zip(
+        ('nonce', 'header', 'ciphertext', 'tag'), 
+        (nonce, header, ciphertext, tag)
+      )
+    }
+
+  def decrypt(self, envelope, header: bytes = b'') -> bytes:
+    if isinstance(envelope, dict):
+      d_bytes = {
+        k: b64decode(envelope[k]) 
+        for k in ('nonce', 'header', 'ciphertext', 'tag')
+      }
+      return self._open(
+        d_bytes['nonce'], d_bytes['ciphertext'], d_bytes['tag'], d_bytes['header']
+      )
+    envelope = memoryview(envelope)
+    if len(envelope) < self.nonce_length + self.mac_tag_length:
+      raise ValueError("AES256 GCM envelope too short")
+    return self._open(
+      bytes(envelope[:self.nonce_length]),
+      bytes(envelope[self.nonce_length:-self.mac_tag_length]),
+      bytes(envelope[-self.mac_tag_length:]),
+      header
+    )
+
+  def encryptor(self, header: bytes = b'') -> "Ingredient":
+    returns = bytes if self.envelope == "binary" else dict
+    return Ingredient("encrypt_aes256_gcm_keyed", self.encrypt, header=header) \
+             .mark(deterministic=False, returns=returns)
+
+  def decryptor(self, header: bytes = b'') -> "Ingredient":
+    return Ingredient("decrypt_aes256_gcm_keyed", self.decrypt, header=header) \
+             .mark(returns=bytes)
+
+# stream implementations: take an iterator of byte chunks and yield chunks
+def _hash_stream(h, chunks):
+  for chunk in chunks:
+    h.update(chunk)
+  yield h.digest()
+
+def hash_keccak_stream(chunks, digest_bits: int=256):
+  from Crypto.Hash import keccak
+  return _hash_stream(keccak.new(digest_bits = digest_bits), chunks)
+
+def hash_sha256_stream(chunks):
+  from Crypto.Hash import SHA256
+  return _hash_stream(SHA256.new(), chunks)
+
+def hash_sha512_stream(chunks):
+  from Crypto.Hash import SHA512
+  return _hash_stream(SHA512.new(), chunks)
+
+def hash_md5_stream(chunks):
+  from Crypto.Hash import MD5
+  return _hash_stream(MD5.new(), chunks)
+
+def bytes_to_b64_stream(chunks, altchars: Optional[bytes] = None):
+  carry = b''
+  for chunk in chunks:
+    if carry:
+      chunk = b''.join((carry, chunk))
+    # only encode multiples of 3 bytes, so no padding ends up mid-stream
+    cut = len(chunk) - len(chunk) % 3
+    carry = bytes(chunk[cut:])
+    if cut:
+      yield b64encode(chunk[:cut], altchars)
+  if carry:
+    yield b64encode(carry, altchars)
+
+def encrypt_aes256_gcm_stream(
+    chunks,
+    key: bytes,
+    header: bytes = b'',
+    nonce: Optional[bytes] = None,
+    mac_tag_length: int = 16
+  ):
+  """
+  Yield the nonce, then the ciphertext chunk by chunk and finally the tag.
+  Joined together the chunks are a nonce|ciphertext|tag binary envelope,
+  the header is not included and has to be known by the receiver
+  """
+  from Crypto.Cipher import AES
+
+  _check_aes256_gcm_params(key, nonce, mac_tag_length)
+
+  cipher = AES.new(
+    key, 
+    AES.MODE_GCM, 
+    nonce=nonce, 
+    mac_len=mac_tag_length
+  )
+  cipher.update(header)
+  yield cipher.nonce
+  for chunk in chunks:
+    yield cipher.encrypt(chunk)
+  yield cipher.digest()
+
+def _join_chunks(chunks):
+  chunks = list(chunks)
+  if len(chunks) == 1:
+    return chunks[0]
+  if chunks and isinstance(chunks[0], str):
+    return ''.join(chunks)
+  return b''.join(chunks)
+
+def _stream_whole(step: Callable) -> Callable:
+  """Adapt a single-value step to a chunk stream by joining its input"""
+  def streamed(chunks):
+    yield step(_join_chunks(chunks))
+  return streamed
+
+def _iter_chunks(source, chunk_size: int):
+  read = getattr(source, 'read', None)
+  if read is not None:
+    while chunk := read(chunk_size):
+      yield chunk
+  elif isinstance(source, (bytes, bytearray, memoryview, str)):
+    yield source
+  else:
+    yield from source
+
+def _bytes_by_default(name: str, position: int, default = None) -> Callable:
+  """
+  returns trait of a function giving bytes while its arg :param name:
+  (the :param position:-th after the value) is left to :param default:,
+  a view otherwise (eg out=, copy=False)
+  """
+  def returns(ingredient) -> Optional[type]:
+    args = ingredient._args
+    value = ingredient._kwargs.get(name, args[position] if len(args) > position else default)
+    return bytes if value is default else None
+  return returns
+
+def _aes256_gcm_nonce_given(ingredient) -> bool:
+  # encrypt_aes256_gcm(data, key, header, nonce, ...) is only repeatable with a fixed nonce
+  args = ingredient._args
+  return (
+    ingredient._kwargs.get('nonce') is not None or
+    (len(args) > 2 and args[2] is not None)
+  )
+
+def _fingerprint_of(step) -> tuple:
+  if isinstance(step, Ingredient):
+    return (
+      step.name,
+      getattr(step.func, '__module__', None),
+      getattr(step.func, '__qualname__', repr(step.func)),
+      repr(step._args),
+      repr(sorted(step._kwargs.items()))
+    )
+  return (
+    getattr(step, '__module__', None),
+    getattr(step, '__qualname__', repr(step)),
+    id(step)
+  )
+
 class Ingredient:
+  # traits declared with :method mark: and their defaults
+  _traits = {
+    # bool, or a function(ingredient) -> bool when it depends on args/kwargs
+    "deterministic": True,
+    # name of the ingredient which exactly undoes this one (same args/kwargs)
+    "inverse": None,
+    # like inverse, but the round-trip normalizes the value (eg hex case, json tuples)
+    "near_inverse": None,
+    # type of the returned value, when always the same,
+    # or a function(ingredient) -> type or None when it depends on args/kwargs
+    "returns": None,
+    # types on which the ingredient returns the value untouched
+    "identity_on": (),
+    # blocks the interpreter long enough to be worth running in an executor
+    "cpu_heavy": False,
+  }
+
   def __init__(self, name, func, *args, **kwargs):
     self.name = name
     self.func = func
+    self._shared = False
     self.args = args
     self.kwargs = kwargs
+    self.batch = None
+    self.stream = None
+    for trait, default in self._traits.items():
+      setattr(self, trait, default)
+
+  def mark(self, **traits) -> "Ingredient":
+    """
+    Declare traits of the ingredient, eg .mark(deterministic=False)
+    """
+    for trait, value in traits.items():
+      if trait not in self._traits:
+        raise TypeError(f"Unknown ingredient trait {trait}")
+      setattr(self, trait, value)
+    return self
+
+  def is_deterministic(self) -> bool:
+    """
+    True if cooking the same value always gives the same result
+    """
+    deterministic = self.deterministic
+    return deterministic(self) if callable(deterministic) else bool(deterministic)
     
+  def result_type(self) -> Optional[type]:
+    """
+    Type of the returned value with the current args/kwargs, None if unknown
+    """
+    returns = self.returns
+    if returns is None or isinstance(returns, type):
+      return returns
+    return returns(self)
+
+  def register_batch(self, batch: Callable) -> "Ingredient":
+    """
+    Register a function cooking a whole list of values at once.
+    It's called as batch(values, *args, **kwargs) and must return a list
+    """
+    self.batch = batch
+    return self
+
+  def register_stream(self, stream: Callable) -> "Ingredient":
+    """
+    Register a function consuming an iterator of chunks with bounded memory.
+    It's called as stream(chunks, *args, **kwargs) and must return an iterator
+    """
+    self.stream = stream
+    return self
+
   def wrap(self):
     def wrapped(value):
-      return self.func(value, *self.args, **self.kwargs)
+      return self.func(value, *self._args, **self._kwargs)
     return wrapped
 
+  def compile(self) -> Callable:
+    """
+    Bind args and kwargs once and return a plain callable.
+    Unlike :method wrap: later changes to args/kwargs
+    won't affect the compiled function
+    """
+    func = self.func
+    args, kwargs = tuple(self._args), dict(self._kwargs)
+    if not args:
+      return partial(func, **kwargs) if kwargs else func
+    return lambda value: func(value, *args, **kwargs)
+
+  def compile_many(self) -> Callable:
+    """
+    Like :method compile: but the returned callable takes and returns lists.
+    Without a registered batch implementation it maps the single-value function
+    """
+    if self.batch is None:
+      step = self.compile()
+      return lambda values: list(map(step, values))
+    batch = self.batch
+    args, kwargs = tuple(self._args), dict(self._kwargs)
+    return lambda values: batch(values, *args, **kwargs)
+
+  def compile_stream(self) -> Callable:
+    """
+    Like :method compile: but the returned callable takes and returns
+    iterators of chunks. Without a registered stream implementation
+    the chunks are joined and cooked as a single value
+    """
+    if self.stream is None:
+      return _stream_whole(self.compile())
+    stream = self.stream
+    args, kwargs = tuple(self._args), dict(self._kwargs)
+    return lambda chunks: stream(chunks, *args, **kwargs)
+
   def cook(self, value):
     return self.wrap()(value)
 
+  def cook_many(self, values: Iterable) -> list:
+    return self.compile_many()(list(values))
+
   def clone(self) -> "Ingredient":
-    return Ingredient(self.name, self.func, *self.args, **self.kwargs)
+    """
+    Copy-on-write clone: args and kwargs are shared with the original
+    until either of the two hands them out through its properties
+    """
+    i = self.__class__.__new__(self.__class__)
+    i.__dict__.update(self.__dict__)
+    i._shared = self._shared = True
+    return i
+
+  def _unshare(self):
+    self._args = list(self._args)
+    self._kwargs = dict(self._kwargs)
+    self._shared = False
 
   @property
   def args(self):
     """Positional arguments."""
+    if self._shared:
+      self._unshare()
     return self._args
   
   @args.setter 
@@ -299,6 +793,8 @@ class Ingredient:
   @property
   def kwargs(self):
     """Keyword arguments."""
+    if self._shared:
+      self._unshare()
     return self._kwargs
 
   @kwargs.setter    
@@ -311,62 +807,156 @@ class Ingredient:
   def __repr__(self):
     return (
         f"Ingredient<{self.name}" + \
-        f" {'*args' if self.args else ''}" + \
-        f" {'**kwargs' if self.kwargs else ''}"
+        f" {'*args' if self._args else ''}" + \
+        f" {'**kwargs' if self._kwargs else ''}"
     ).strip() + ">"
 
-class Ingredients:
-  bytes_to_b64 = Ingredient("bytes_to_b64", b64encode)
-  b64_to_bytes = Ingredient("b64_to_bytes", b64decode)
-  urlencode    = Ingredient("urlencode", urlencode)
-  urldecode    = Ingredient("urldecode", urldecode)
-  to_json      = Ingredient("to_json", json_dumps)
-  from_json    = Ingredient("from_json", json_loads)
-  hex_to_bytes = Ingredient("hex_to_bytes", hex_to_bytes)
-  bytes_to_hex = Ingredient("bytes_to_hex", bytes_to_hex)
-  cast_to_bytes= Ingredient("cast_to_bytes", cast_to_bytes)
-  cast_to_str  = Ingredient("cast_to_str", cast_to_str)
-  str_to_bytes = Ingredient("str_to_bytes", str_to_bytes)
-  bytes_to_str = Ingredient("bytes_to_str", bytes_to_str)
-  int_to_octet = Ingredient("int_to_octet", int_to_octet)
-  octet_to_int = Ingredient("octet_to_int", octet_to_int)
-  bytes_to_ints= Ingredient("bytes_to_ints", bytes_to_ints)
-  ints_to_bytes= Ingredient("ints_to_bytes", ints_to_bytes)
-  hash_keccak  = Ingredient("hash_keccak", hash_keccak)
-  hash_sha256  = Ingredient("hash_sha256", hash_sha256)
-  hash_sha512  = Ingredient("hash_sha512", hash_sha512)
-  hash_md5     = Ingredient("hash_md5", hash_md5)
-  sign_hmac_sha256 = Ingredient("sign_hmac_sha256", sign_hmac_sha256)
-  derive_key_pbkdf2_sha512 = Ingredient("derive_key_pbkdf2_sha512", derive_key_pbkdf2_sha512, 32)
-  password_hash_bcrypt  = Ingredient("password_hash_bcrypt", password_hash_bcrypt)
-  password_check_bcrypt = Ingredient("password_check_bcrypt", password_check_bcrypt)
-  encrypt_aes256_gcm    = Ingredient("encrypt_aes256_gcm", encrypt_aes256_gcm)
-  decrypt_aes256_gcm    = Ingredient("decrypt_aes256_gcm", decrypt_aes256_gcm)
-  
-  _methods = ['get', 'add', 'list', 'grep']
+class _Lazy:
+  """
+  Registry entry built on first lookup
+  """
+  __slots__ = ('factory', 'args')
+
+  def __init__(self, factory: Callable, *args):
+    self.factory = factory
+    self.args = args
+
+  def build(self):
+    return self.factory(*self.args)
+
+class _Registry(type):
+  """
+  Metaclass of Ingredients and Recipes: public class attributes are kept
+  in a name -> entry dict, _Lazy entries are built on first lookup
+  and grep is served by a substring index
+  """
+  def __new__(mcs, name, bases, namespace):
+    entries = {
+      k: namespace.pop(k) for k in list(namespace)
+      if not k.startswith('_') and mcs._is_entry(namespace[k])
+    }
+    cls = super().__new__(mcs, name, bases, namespace)
+    cls._entries = entries
+    cls._index = None
+    return cls
+
+  @staticmethod
+  def _is_entry(value) -> bool:
+    # Ingredient and Recipe instances, or _Lazy factories of them
+    return isinstance(value, _Lazy) or callable(getattr(value, 'clone', None))
+
+  def __getattr__(cls, name):
+    # only reached when the normal lookup fails, keeps Ingredients.hash_sha256 working
+    if name.startswith('_'):
+      raise AttributeError(name)
+    try:
+      return cls.peek(name, raise_on_None=True)
+    except ValueError:
+      raise AttributeError(f"{cls._kind} {name} not available")
+
+  def __setattr__(cls, name, value):
+    if not name.startswith('_') and cls._is_entry(value):
+      cls._entries[name] = value
+      cls._index = None
+      return
+    super().__setattr__(name, value)
+
+  def peek(cls, name, default = None, raise_on_None = False):
+    """
+    The registered entry itself (not a clone), don't change it
+    """
+    entry = cls._entries.get(name)
+    if entry is None:
+      if raise_on_None and default is None:
+        raise ValueError(f"{cls._kind} {name} not available")
+      return default
+    if isinstance(entry, _Lazy):
+      entry = cls._entries[name] = entry.build()
+    return entry
 
-  @classmethod
   def get(cls, name, default = None, raise_on_None = True):
-    i = getattr(cls, name, default)
-    if raise_on_None and (i is None):
-      raise ValueError(f"Ingredient {name} not available")
-    return i.clone()
-  
-  @classmethod
-  def add(cls, ingredient):
-    setattr(cls, ingredient.name, ingredient)
-    return getattr(cls, ingredient.name, None)
+    i = cls.peek(name, default, raise_on_None)
+    return None if i is None else i.clone()
+
+  def add(cls, entry):
+    cls._entries[entry.name] = entry
+    cls._index = None
+    return entry
 
-  @classmethod
   def list(cls):
-    return list(filter(
-      lambda k: not any((k.startswith('_'), k in cls._methods)),
-      cls.__dict__.keys())
-    )
+    return list(cls._entries)
 
-  @classmethod
   def grep(cls, s):
-    return list(filter(lambda k: s in k, cls.list()))
+    if cls._index is None:
+      index = {}
+      for name in cls._entries:
+        for i in range(len(name)):
+          for j in range(i + 1, len(name) + 1):
+            index.setdefault(name[i:j], {})[name] = None
+      cls._index = index
+    if not s:
+      return cls.list()
+    return list(cls._index.get(s, ()))
+
+class Ingredients(metaclass=_Registry):
+  _kind = "Ingredient"
+  bytes_to_b64 = Ingredient("bytes_to_b64", bytes_to_b64) \
+                   .register_batch(bytes_to_b64_many) \
+                   .register_stream(bytes_to_b64_stream) \
+                   .mark(inverse="b64_to_bytes", returns=_bytes_by_default("out", 1))
+  b64_to_bytes = Ingredient("b64_to_bytes", b64decode) \
+                   .register_batch(b64_to_bytes_many) \
+                   .mark(near_inverse="bytes_to_b64", returns=bytes)
+  urlencode    = Ingredient("urlencode", urlencode).mark(returns=str)
+  urldecode    = Ingredient("urldecode", urldecode).mark(returns=str)
+  to_json      = Ingredient("to_json", json_dumps).mark(near_inverse="from_json", returns=str)
+  from_json    = Ingredient("from_json", json_loads).mark(near_inverse="to_json")
+  hex_to_bytes = Ingredient("hex_to_bytes", hex_to_bytes) \
+                   .register_batch(hex_to_bytes_many) \
+                   .mark(near_inverse="bytes_to_hex", returns=_bytes_by_default("out", 0))
+  bytes_to_hex = Ingredient("bytes_to_hex", bytes_to_hex) \
+                   .register_batch(bytes_to_hex_many) \
+                   .mark(inverse="hex_to_bytes", returns=str)
+  cast_to_bytes= Ingredient("cast_to_bytes", cast_to_bytes) \
+                   .mark(identity_on=(bytes,), returns=_bytes_by_default("copy", 1, True))
+  cast_to_str  = Ingredient("cast_to_str", cast_to_str).mark(identity_on=(str,), returns=str)
+  str_to_bytes = Ingredient("str_to_bytes", str_to_bytes) \
+                   .register_batch(str_to_bytes_many) \
+                   .mark(inverse="bytes_to_str", returns=bytes)
+  bytes_to_str = Ingredient("bytes_to_str", bytes_to_str) \
+                   .register_batch(bytes_to_str_many) \
+                   .mark(near_inverse="str_to_bytes", returns=str)
+  int_to_octet = Ingredient("int_to_octet", int_to_octet).mark(returns=str)
+  octet_to_int = Ingredient("octet_to_int", octet_to_int).mark(returns=int)
+  bytes_to_ints= Ingredient("bytes_to_ints", bytes_to_ints) \
+                   .register_batch(bytes_to_ints_many) \
+                   .mark(inverse="ints_to_bytes", returns=list)
+  ints_to_bytes= Ingredient("ints_to_bytes", ints_to_bytes) \
+                   .register_batch(ints_to_bytes_many) \
+                   .mark(returns=_bytes_by_default("out", 0))
+  hash_keccak  = Ingredient("hash_keccak", hash_keccak) \
+                   .register_stream(hash_keccak_stream) \
+                   .mark(returns=bytes)
+  hash_sha256  = Ingredient("hash_sha256", hash_sha256) \
+                   .register_stream(hash_sha256_stream) \
+                   .mark(returns=bytes)
+  hash_sha512  = Ingredient("hash_sha512", hash_sha512) \
+                   .register_stream(hash_sha512_stream) \
+                   .mark(returns=bytes)
+  hash_md5     = Ingredient("hash_md5", hash_md5) \
+                   .register_stream(hash_md5_stream) \
+                   .mark(returns=bytes)
+  sign_hmac_sha256 = Ingredient("sign_hmac_sha256", sign_hmac_sha256).mark(returns=bytes)
+  derive_key_pbkdf2_sha512 = Ingredient("derive_key_pbkdf2_sha512", derive_key_pbkdf2_sha512, 32) \
+                               .mark(deterministic=False, cpu_heavy=True, returns=bytes)
+  password_hash_bcrypt  = Ingredient("password_hash_bcrypt", password_hash_bcrypt) \
+                            .mark(deterministic=False, cpu_heavy=True, returns=bytes)
+  password_check_bcrypt = Ingredient("password_check_bcrypt", password_check_bcrypt) \
+                            .mark(cpu_heavy=True, returns=bool)
+  encrypt_aes256_gcm    = Ingredient("encrypt_aes256_gcm", encrypt_aes256_gcm) \
+                            .register_stream(encrypt_aes256_gcm_stream) \
+                            .mark(deterministic=_aes256_gcm_nonce_given, returns=dict)
+  decrypt_aes256_gcm    = Ingredient("decrypt_aes256_gcm", decrypt_aes256_gcm).mark(returns=bytes)
 
 class Recipe:
   def __init__(self, name, *args):
@@ -421,66 +1011,572 @@ class Recipe:
       return value
     return wrapped
 
-  def cook(self, v, dbg: Optional[Callable] = None):
+  def compile(self) -> Callable:
+    """
+    Resolve every step ahead of time into a single flat callable.
+    Args and kwargs are bound at compile time, so the returned
+    function won't see later changes to the ingredients
+    """
+    steps = tuple(
+      ingredient.compile() if isinstance(ingredient, Ingredient)
+      else ingredient
+      for ingredient in self.ingredients
+    )
+    if len(steps) == 1:
+      return steps[0]
+
+    def compiled(value):
+      for step in steps:
+        value = step(value)
+      return value
+    return compiled
+
+  def compile_many(self) -> Callable:
+    """
+    Like :method compile: but the returned callable takes a list of values
+    and moves the whole batch through each step before the next one
+    """
+    steps = tuple(
+      ingredient.compile_many() if isinstance(ingredient, Ingredient)
+      else partial(_map_list, ingredient)
+      for ingredient in self.ingredients
+    )
+
+    def compiled(values):
+      for step in steps:
+        values = step(values)
+      return list(values)
+    return compiled
+
+  def compile_stream(self) -> Callable:
+    """
+    Like :method compile: but the returned callable takes an iterator of
+    chunks and returns an iterator of chunks. Steps without a stream
+    implementation join their input, so keep them after the streamed ones
+    """
+    steps = tuple(
+      ingredient.compile_stream() if isinstance(ingredient, Ingredient)
+      else _stream_whole(ingredient)
+      for ingredient in self.ingredients
+    )
+
+    def compiled(chunks):
+      for step in steps:
+        chunks = step(chunks)
+      return chunks
+    return compiled
+
+  def wrap_profile(self, profiler: Optional["RecipeProfiler"] = None) -> Callable:
+    """
+    Like :method wrap_debug: but timing each step into a :class RecipeProfiler:
+    (available as .profiler on the returned function).
+    Calls which are not sampled run the compiled recipe, with no overhead
+    """
+    profiler = profiler if profiler is not None else RecipeProfiler()
+    fast = self.compile()
+    steps = tuple(
+      (
+        step,
+        ingredient.name if isinstance(ingredient, Ingredient)
+        else getattr(ingredient, '__name__', repr(ingredient)),
+        ingredient.compile() if isinstance(ingredient, Ingredient)
+        else ingredient
+      )
+      for step, ingredient in enumerate(self.ingredients)
+    )
+
+    def wrapped(value):
+      profiler.calls += 1
+      if profiler.calls % profiler.sample_every:
+        return fast(value)
+      profiler.sampled += 1
+      for step, name, func in steps:
+        start = perf_counter_ns()
+        out = func(value)
+        elapsed = perf_counter_ns() - start
+        profiler.record(step, name, elapsed, _size_of(value), _size_of(out))
+        value = out
+      return value
+    wrapped.profiler = profiler
+    return wrapped
+
+  def cook(
+      self, 
+      v, 
+      dbg: Optional[Callable] = None, 
+      profiler: Optional["RecipeProfiler"] = None
+    ):
+    if profiler is not None:
+      return self.wrap_profile(profiler)(v)
     return (
-      self.wrap()(v) if not callable(dbg) 
+      self.compile()(v) if not callable(dbg) 
       else self.wrap_debug(dbg)(v)
     )
 
+  def cook_many(self, values: Iterable, batch_size: Optional[int] = None) -> list:
+    """
+    Cook every value of :param values: step by step on whole batches.
+    :param batch_size: limits how many values are in flight at once,
+    by default the whole iterable is cooked as a single batch
+    """
+    compiled = self.compile_many()
+    if not batch_size:
+      return compiled(list(values))
+    ret = []
+    it = iter(values)
+    while batch := list(islice(it, batch_size)):
+      ret.extend(compiled(batch))
+    return ret
+
+  def optimize(self, lossy: bool = False) -> "Recipe":
+    """
+    Return a new recipe without the steps that cancel each other out,
+    using the inverse/returns/identity_on traits of the ingredients:
+    - an ingredient followed by its inverse (with the same args/kwargs)
+    - a cast on a value already known to be of the target type
+    :param lossy: also cancel near inverses, accepting the normalization
+    of the value (eg hex_to_bytes -> bytes_to_hex won't keep uppercase)
+    """
+    kept = []  # (ingredient, type of the value before it)
+    known = None
+    for ingredient in self.ingredients:
+      if not isinstance(ingredient, Ingredient):
+        kept.append((ingredient, known))
+        known = None
+        continue
+      if known is not None and ingredient.identity_on and issubclass(known, ingredient.identity_on):
+        continue
+      if kept:
+        previous = kept[-1][0]
+        if (
+            isinstance(previous, Ingredient) and
+            ingredient.name in (
+              previous.inverse, 
+              previous.near_inverse if lossy else None
+            ) and
+            previous._args == ingredient._args and 
+            previous._kwargs == ingredient._kwargs
+          ):
+          known = kept.pop()[1]
+          continue
+      kept.append((ingredient, known))
+      known = ingredient.result_type()
+    return Recipe(self.name, *(ingredient for ingredient, _ in kept))
+
+  def fingerprint(self) -> str:
+    """
+    Digest of the steps and their current args/kwargs
+    """
+    return sha256(
+      repr([_fingerprint_of(step) for step in self.ingredients]).encode('utf8')
+    ).hexdigest()
+
+  def non_deterministic(self) -> list:
+    """
+    Ingredients which won't give the same result for the same value.
+    Plain functions are trusted to be pure
+    """
+    return [
+      ingredient for ingredient in self.ingredients
+      if isinstance(ingredient, Ingredient) and not ingredient.is_deterministic()
+    ]
+
+  def cached(
+      self, 
+      maxsize: Optional[int] = 1024, 
+      ttl: Optional[float] = None, 
+      copy: bool = True
+    ) -> "CachedRecipe":
+    """
+    Compile the recipe behind an LRU cache of :param maxsize: results
+    (None for unbounded) which expire after :param ttl: seconds.
+    Mutable results (eg from_json dicts) are deep copied in and out of the cache
+    unless :param copy: is False, then callers must not mutate them.
+    Raise a ValueError if any ingredient is not deterministic
+    """
+    non_deterministic = self.non_deterministic()
+    if non_deterministic:
+      raise ValueError(
+        f"Recipe {self.name} can't be cached, non deterministic ingredients: " + \
+        ", ".join(i.name for i in non_deterministic)
+      )
+    return CachedRecipe(self, maxsize, ttl, copy)
+
+  def cook_stream(self, source, chunk_size: int = 2 ** 16):
+    """
+    Cook a file object (read in :param chunk_size: blocks), a bytes-like
+    value or an iterable of chunks, returning an iterator of output chunks.
+    Hashes yield a single digest chunk, base64 yields encoded pieces
+    and aes256 gcm yields a nonce|ciphertext|tag envelope
+    """
+    return self.compile_stream()(_iter_chunks(source, chunk_size))
+
+  async def acook(self, value, executor: Optional[Executor] = None):
+    """
+    Cook without blocking the event loop: cpu heavy ingredients run in
+    :param executor: (the loop default executor if None), the others inline.
+    With a ProcessPoolExecutor the cpu heavy functions must be picklable
+    (module level), their args and kwargs too
+    """
+    return await _acook(self._async_plan(), value, executor)
+
+  async def acook_many(
+      self, 
+      values: Iterable, 
+      executor: Optional[Executor] = None, 
+      limit: int = 32
+    ) -> list:
+    """
+    Like :method acook: for many values, returned in input order.
+    At most :param limit: values are in flight at the same time
+    """
+    if limit < 1:
+      raise ValueError("limit must be a positive integer")
+    plan = self._async_plan()
+    values = list(values)
+    results = [None] * len(values)
+    pending = iter(enumerate(values))
+
+    async def worker():
+      for i, value in pending:
+        results[i] = await _acook(plan, value, executor)
+
+    await asyncio.gather(*(worker() for _ in range(min(limit, len(values)))))
+    return results
+
+  def _async_plan(self) -> tuple:
+    """
+    Compiled (cpu_heavy, function) steps, where consecutive
+    cheap ingredients are merged into a single inline call
+    """
+    plan = []
+    cheap = []
+    for ingredient in self.ingredients:
+      if isinstance(ingredient, Ingredient) and ingredient.cpu_heavy:
+        if cheap:
+          plan.append((False, Recipe(self.name, *cheap).compile()))
+          cheap = []
+        plan.append((True, _BoundCall(ingredient.func, ingredient._args, ingredient._kwargs)))
+      else:
+        cheap.append(ingredient)
+    if cheap:
+      plan.append((False, Recipe(self.name, *cheap).compile()))
+    return tuple(plan)
+
+  def cook_parallel(
+      self, 
+      values: Iterable, 
+      workers: Optional[int] = None, 
+      chunksize: int = 1
+    ) -> list:
+    """
+    Cook :param values: on a pool of :param workers: processes
+    and return the results in input order.
+    Each worker rebuilds the recipe once from the Ingredients/Recipes
+    entries, so the lambdas of registered recipes don't need to be picklable.
+    On spawn platforms (Windows, macOS) call it under `if __name__ == "__main__":`
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_parallel_init,
+        initargs=(self.name, self._portable())
+      ) as pool:
+      return list(pool.map(_parallel_cook, values, chunksize=chunksize))
+
+  def _portable(self) -> tuple:
+    """
+    Picklable description of the steps: registered ingredients become
+    (name, args, kwargs) tuples, plain functions of a registered recipe
+    become references to its step, anything else is pickled as it is
+    """
+    registered = Recipes.peek(self.name)
+    steps = []
+    for step, ingredient in enumerate(self.ingredients):
+      if isinstance(ingredient, Ingredient):
+        known = Ingredients.peek(ingredient.name)
+        if isinstance(known, Ingredient) and known.func is ingredient.func:
+          steps.append(("ingredient", (
+            ingredient.name, 
+            list(ingredient._args), 
+            dict(ingredient._kwargs)
+          )))
+          continue
+      elif (
+          isinstance(registered, Recipe) and 
+          step < len(registered.ingredients) and
+          registered.ingredients[step] is ingredient
+        ):
+        steps.append(("recipe", (self.name, step)))
+        continue
+      steps.append(("step", ingredient))
+    return tuple(steps)
+
+  @classmethod
+  def _from_portable(cls, name, steps) -> "Recipe":
+    args = []
+    for kind, step in steps:
+      if kind == "recipe":
+        recipe_name, i = step
+        step = Recipes.peek(recipe_name).ingredients[i]
+      args.append(step)
+    return cls(name, *args)
+
   def clone(self) -> "Recipe":
-    return Recipe(self.name, *self.ingredients)
+    """
+    Cheap copy: ingredients are copy-on-write clones,
+    so changing their kwargs won't affect this recipe
+    """
+    r = self.__class__.__new__(self.__class__)
+    r.name = self.name
+    r.ingredients = [
+      ingredient.clone() if isinstance(ingredient, Ingredient) else ingredient
+      for ingredient in self.ingredients
+    ]
+    return r
+
+def _size_of(v) -> Optional[int]:
+  try:
+    return len(v)
+  except TypeError:
+    return None
+
+class RecipeProfiler:
+  """
+  Per-step wall time, call count and input/output sizes aggregated
+  across many calls of a recipe, see :method Recipe.wrap_profile:
+  Only one call every :param sample_every: is measured
+  """
+  def __init__(self, sample_every: int = 1):
+    if sample_every < 1:
+      raise ValueError("sample_every must be a positive integer")
+    self.sample_every = sample_every
+    self.calls = 0
+    self.sampled = 0
+    self._steps = {}
+    self._lock = Lock()
+
+  def record(self, step: int, name: str, elapsed_ns: int, in_size: Optional[int], out_size: Optional[int]):
+    with self._lock:
+      stats = self._steps.get((step, name))
+      if stats is None:
+        # calls, total ns, min ns, max ns, input size, output size
+        stats = self._steps[(step, name)] = [0, 0, elapsed_ns, elapsed_ns, 0, 0]
+      stats[0] += 1
+      stats[1] += elapsed_ns
+      stats[2] = min(stats[2], elapsed_ns)
+      stats[3] = max(stats[3], elapsed_ns)
+      stats[4] += in_size or 0
+      stats[5] += out_size or 0
+
+  def report(self) -> list:
+    """
+    One dict per step, the one dominating the recipe latency first
+    """
+    with self._lock:
+      steps = sorted(self._steps.items())
+    total = sum(stats[1] for _, stats in steps) or 1
+    ret = [
+      {
+        "step": step,
+        "ingredient": name,
+        "calls": calls,
+        "total_s": total_ns / 1e9,
+        "mean_us": total_ns / calls / 1e3,
+        "min_us": min_ns / 1e3,
+        "max_us": max_ns / 1e3,
+        "share": total_ns / total,
+        "mean_in_size": in_size / calls,
+        "mean_out_size": out_size / calls,
+      }
+      for (step, name), (calls, total_ns, min_ns, max_ns, in_size, out_size) in steps
+    ]
+    return sorted(ret, key=lambda r: r["total_s"], reverse=True)
+
+  def reset(self):
+    with self._lock:
+      self._steps.clear()
+    self.calls = 0
+    self.sampled = 0
+
+  def __str__(self):
+    lines = [
+      f"{self.sampled}/{self.calls} calls sampled",
+      f"{'step':>4} {'ingredient':<28} {'share':>7} {'mean us':>10} {'max us':>10} {'in':>9} {'out':>9}"
+    ]
+    for r in self.report():
+      lines.append(
+        f"{r['step']:>4} {r['ingredient'][:28]:<28} {r['share']:>7.1%} " + \
+        f"{r['mean_us']:>10.2f} {r['max_us']:>10.2f} " + \
+        f"{r['mean_in_size']:>9.0f} {r['mean_out_size']:>9.0f}"
+      )
+    return "\n".join(lines)
+
+class CachedRecipe:
+  """
+  Memoized compiled recipe, built by :method Recipe.cached:
+  Results are keyed on the recipe fingerprint and the cooked value,
+  unhashable values are cooked without touching the cache
+  """
+  # results of these types are shared between callers without copies
+  IMMUTABLE = (str, bytes, int, float, bool, type(None))
+
+  def __init__(
+      self, 
+      recipe: Recipe, 
+      maxsize: Optional[int] = 1024, 
+      ttl: Optional[float] = None, 
+      copy: bool = True
+    ):
+    self.name = recipe.name
+    self.fingerprint = recipe.fingerprint()
+    self.maxsize = maxsize
+    self.ttl = ttl
+    self.copy = copy
+    self._func = recipe.compile()
+    self._store = OrderedDict()
+    self._lock = Lock()
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    self.expirations = 0
+
+  def __call__(self, value):
+    key = (self.fingerprint, value.__class__, value)
+    try:
+      hash(key)
+    except TypeError:
+      self.misses += 1
+      return self._func(value)
+
+    with self._lock:
+      entry = self._store.get(key)
+      if entry is not None:
+        result, expires = entry
+        if expires is None or expires > monotonic():
+          self._store.move_to_end(key)
+          self.hits += 1
+          return self._copy(result)
+        del self._store[key]
+        self.expirations += 1
+      self.misses += 1
+
+    result = self._func(value)
+    expires = None if self.ttl is None else monotonic() + self.ttl
+    with self._lock:
+      self._store[key] = (self._copy(result), expires)
+      self._store.move_to_end(key)
+      if self.maxsize is not None:
+        while len(self._store) > self.maxsize:
+          self._store.popitem(last=False)
+          self.evictions += 1
+    return result
+
+  def _copy(self, result):
+    if not self.copy or isinstance(result, self.IMMUTABLE):
+      return result
+    return deepcopy(result)
 
-class Recipes:
-  urlencoded = Recipe("urlencoded",
+  def cook(self, value):
+    return self(value)
+
+  def info(self) -> dict:
+    """
+    Counters to size the cache
+    """
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+      "expirations": self.expirations,
+      "size": len(self._store),
+      "maxsize": self.maxsize,
+      "ttl": self.ttl,
+    }
+
+  def clear(self):
+    with self._lock:
+      self._store.clear()
+
+  def __len__(self):
+    return len(self._store)
+
+  def __repr__(self):
+    return f"CachedRecipe<{self.name} {self.hits}/{self.hits + self.misses} hits>"
+
+class Recipes(metaclass=_Registry):
+  _kind = "Recipe"
+
+  urlencoded = _Lazy(Recipe, "urlencoded",
     lambda s: str(s) if isinstance(s, (int, float)) else s,  # cast numbers to strings
     "urlencode"                                              # then urlencode
   )
 
-  to_urlencoded_b64_string = Recipe("to_urlencoded_b64_string",
+  to_urlencoded_b64_string = _Lazy(Recipe, "to_urlencoded_b64_string",
     lambda s: coherce_bytes(s, 'utf8'),   # cast everything to bytes
     "bytes_to_b64",                       # get a b64 encoded str
     "urlencode"                           # urlencode it
   )
 
-  hash_string = Recipe("hash_string",
+  hash_string = _Lazy(Recipe, "hash_string",
     "str_to_bytes",
     "hash_sha256",
     "bytes_to_hex"
   )
 
-  encrypt_string = Recipe("encrypt_string",
+  encrypt_string = _Lazy(Recipe, "encrypt_string",
     "str_to_bytes",
     ("encrypt_aes256_gcm", [], {"key": b'1234' * 4}),
     "to_json"
   )
 
-  decrypt_string = Recipe("decrypt_string",
+  decrypt_string = _Lazy(Recipe, "decrypt_string",
     "from_json",
     ("decrypt_aes256_gcm", [], {"key": b'1234' * 4}),
     "bytes_to_str"
   )
 
-  _methods = ['get', 'add', 'list', 'grep']
+def _map_list(func: Callable, values) -> list:
+  # a list, not a lazy map: the next step may be a batch expecting one
+  return list(map(func, values))
 
-  @classmethod
-  def get(cls, name, default = None, raise_on_None = True):
-    i = getattr(cls, name, default)
-    if raise_on_None and (i is None):
-      raise ValueError(f"Recipe {name} not available")
-    return i.clone()
-    
-  @classmethod
-  def add(cls, recipe):
-    setattr(cls, recipe.name, recipe)
-    return getattr(cls, recipe.name, None)
+class _BoundCall:
+  """
+  func(value, *args, **kwargs) as a picklable callable (unlike the lambdas of
+  :method Ingredient.compile:), for the steps sent to a ProcessPoolExecutor
+  """
+  __slots__ = ("func", "args", "kwargs")
 
-  @classmethod
-  def list(cls):
-    return list(filter(
-      lambda k: not any((k.startswith('_'), k in cls._methods)),
-      cls.__dict__.keys())
-    )
+  def __init__(self, func: Callable, args, kwargs):
+    self.func = func
+    self.args = tuple(args)
+    self.kwargs = dict(kwargs)
 
-  @classmethod
-  def grep(cls, s):
-    return list(filter(lambda k: s in k, cls.list()))
+  def __call__(self, value):
+    return self.func(value, *self.args, **self.kwargs)
+
+  def __getstate__(self):
+    return self.func, self.args, self.kwargs
+
+  def __setstate__(self, state):
+    self.func, self.args, self.kwargs = state
+
+async def _acook(plan, value, executor):
+  loop = asyncio.get_running_loop()
+  for cpu_heavy, func in plan:
+    if cpu_heavy:
+      value = await loop.run_in_executor(executor, func, value)
+    else:
+      value = func(value)
+  return value
+
+# process pool helpers for Recipe.cook_parallel
+_parallel_recipe = None
+
+def _parallel_init(name, steps):
+  global _parallel_recipe
+  _parallel_recipe = Recipe._from_portable(name, steps).compile()
+
+def _parallel_cook(value):
+  return _parallel_recipe(value)
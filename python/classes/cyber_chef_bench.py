@@ -0,0 +1,344 @@
+"""
+  Benchmark harness for cyber_chef.py
+  Cooks every entry of Ingredients and Recipes at several payload sizes
+  and reports throughput (MB/s, ops/s), allocations and peak memory
+  as JSON, so results of two commits can be compared
+
+  ---
+    python cyber_chef_bench.py -o before.json
+    ... change cyber_chef.py ...
+    python cyber_chef_bench.py -o after.json -c before.json
+
+    python cyber_chef_bench.py -s 64,4K -g hash    # only some entries/sizes
+
+  ---
+  Timings are taken without tracing, then a single extra call runs under
+  tracemalloc to measure the allocations (so they don't slow the timings).
+  Entries whose cost doesn't depend on the payload (key derivation, bcrypt,
+  octets) only run at the smallest size.
+  Failing entries are reported with their error instead of stopping the run.
+"""
+
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from base64 import b64encode
+from random import Random
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from cyber_chef import Ingredients, Recipes
+
+AES_KEY = b'1234' * 4
+# maps random bytes to url-unsafe ascii text
+_TEXT_TABLE = bytes(
+  b"abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789/&=?"[i % 67]
+  for i in range(256)
+)
+
+# payload size independent entries, only measured at the smallest size
+FIXED_SIZE = {
+  "int_to_octet",
+  "octet_to_int",
+  "derive_key_pbkdf2_sha512",
+  "password_hash_bcrypt",
+  "password_check_bcrypt",
+}
+
+def _bytes(n: int, seed: int) -> bytes:
+  return Random(seed).randbytes(n)
+
+def _text(n: int, seed: int) -> str:
+  return _bytes(n, seed).translate(_TEXT_TABLE).decode('ascii')
+
+def _encrypted(n: int, seed: int) -> dict:
+  encrypt = Ingredients.get('encrypt_aes256_gcm')
+  encrypt.kwargs['key'] = AES_KEY
+  return encrypt.cook(_bytes(n, seed))
+
+# entry name -> (function(size, seed) -> value to cook, kwargs, 
+#                optional function(size, seed, value) -> args)
+PAYLOADS: Dict[str, tuple] = {
+  "bytes_to_b64": (_bytes, {}),
+  "b64_to_bytes": (lambda n, s: b64encode(_bytes(n * 3 // 4, s)), {}),
+  "urlencode": (_text, {}),
+  "urldecode": (lambda n, s: quote(_text(n, s)), {}),
+  "to_json": (lambda n, s: [_text(14, s + i) for i in range(max(1, n // 16))], {}),
+  "from_json": (lambda n, s: json.dumps([_text(14, s + i) for i in range(max(1, n // 16))]), {}),
+  "hex_to_bytes": (lambda n, s: _bytes(n // 2, s).hex(), {}),
+  "bytes_to_hex": (_bytes, {}),
+  "cast_to_bytes": (_text, {}),
+  "cast_to_str": (_bytes, {"encoding": "latin1"}),
+  "str_to_bytes": (_text, {}),
+  "bytes_to_str": (_bytes, {"encoding": "latin1"}),
+  "int_to_octet": (lambda n, s: Random(s).randint(0, 255), {}),
+  "octet_to_int": (lambda n, s: f"{Random(s).randint(0, 255):08b}", {}),
+  "bytes_to_ints": (_bytes, {}),
+  "ints_to_bytes": (lambda n, s: list(_bytes(n, s)), {}),
+  "hash_keccak": (_bytes, {}),
+  "hash_sha256": (_bytes, {}),
+  "hash_sha512": (_bytes, {}),
+  "hash_md5": (_bytes, {}),
+  # sign_hmac_sha256(secret, data): the payload is the signed data
+  "sign_hmac_sha256": (lambda n, s: AES_KEY, {}, lambda n, s, v: [_bytes(n, s)]),
+  "derive_key_pbkdf2_sha512": (lambda n, s: _bytes(16, s), {}),
+  "password_hash_bcrypt": (lambda n, s: _bytes(32, s), {}),
+  "password_check_bcrypt": (
+    lambda n, s: _bytes(32, s), {},
+    lambda n, s, v: [Ingredients.get('password_hash_bcrypt').cook(v)]
+  ),
+  "encrypt_aes256_gcm": (_bytes, {"key": AES_KEY}),
+  "decrypt_aes256_gcm": (_encrypted, {"key": AES_KEY}),
+  # recipes
+  "urlencoded": (_text, {}),
+  "to_urlencoded_b64_string": (_text, {}),
+  "hash_string": (_text, {}),
+  "encrypt_string": (_text, {}),
+  "decrypt_string": (lambda n, s: Recipes.get('encrypt_string').cook(_text(n, s)), {}),
+}
+
+def _setup(kind: str, name: str, size: int, seed: int) -> tuple:
+  """
+  Return the compiled entry and the value to cook with it
+  """
+  make_value, kwargs, *make_args = PAYLOADS[name]
+  value = make_value(size, seed)
+  entry = (Ingredients if kind == "ingredient" else Recipes).get(name)
+  if kind == "ingredient":
+    if make_args:
+      entry.args = make_args[0](size, seed, value)
+    entry.kwargs.update(kwargs)
+  return entry.compile(), value
+
+def _time(func: Callable, value, min_time: float, max_calls: int) -> tuple:
+  func(value)  # warm up (lazy imports, caches)
+  calls = 0
+  start = perf_counter()
+  elapsed = 0.0
+  while elapsed < min_time and calls < max_calls:
+    func(value)
+    calls += 1
+    elapsed = perf_counter() - start
+  return calls, elapsed
+
+def _traced(func: Callable, value) -> dict:
+  tracemalloc.start()
+  try:
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = func(value)
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+  finally:
+    tracemalloc.stop()
+  del result
+  blocks = sum(
+    max(stat.count_diff, 0)
+    for stat in after.compare_to(before, 'lineno')
+  )
+  return {
+    "peak_bytes": peak - base,
+    "retained_bytes": current - base,
+    "allocated_blocks": blocks,
+  }
+
+def run(
+    sizes: List[int],
+    grep: Optional[str] = None,
+    min_time: float = 0.2,
+    max_calls: int = 10 ** 6,
+    seed: int = 0,
+  ) -> List[dict]:
+  results = []
+  entries = [
+    ("ingredient", name) for name in Ingredients.list()
+  ] + [
+    ("recipe", name) for name in Recipes.list()
+  ]
+  for kind, name in entries:
+    if grep and grep not in name:
+      continue
+    if name not in PAYLOADS:
+      results.append({"kind": kind, "name": name, "error": "no payload defined"})
+      continue
+    for size in (sizes[:1] if name in FIXED_SIZE else sizes):
+      r = {"kind": kind, "name": name, "size": size}
+      try:
+        func, value = _setup(kind, name, size, seed)
+        calls, elapsed = _time(func, value, min_time, max_calls)
+        r.update({
+          "calls": calls,
+          "seconds": elapsed,
+          "ops_s": calls / elapsed,
+          "mb_s": size * calls / elapsed / 1e6,
+        })
+        r.update(_traced(func, value))
+      except Exception as e:
+        r["error"] = f"{e.__class__.__name__}: {e}"
+      print(_format(r), file=sys.stderr)
+      results.append(r)
+  return results
+
+def compare(results: List[dict], baseline: List[dict]) -> List[dict]:
+  """
+  Speedup of :param results: over :param baseline: (>1 is faster)
+  """
+  old = {
+    (r["kind"], r["name"], r.get("size")): r
+    for r in baseline if "ops_s" in r
+  }
+  ret = []
+  for r in results:
+    b = old.get((r["kind"], r["name"], r.get("size")))
+    if b is None or "ops_s" not in r:
+      continue
+    ret.append({
+      "kind": r["kind"],
+      "name": r["name"],
+      "size": r["size"],
+      "speedup": r["ops_s"] / b["ops_s"],
+      "peak_ratio": (r["peak_bytes"] + 1) / (b["peak_bytes"] + 1),
+    })
+  return ret
+
+def _format(r: dict) -> str:
+  head = f"{r['kind']:<10} {r['name']:<26} {_fmt_size(r.get('size', 0)):>6}"
+  if "error" in r:
+    return f"{head}  ! {r['error']}"
+  return (
+    f"{head} {r['ops_s']:>12.1f} ops/s {r['mb_s']:>10.2f} MB/s" + \
+    f" peak {_fmt_size(r['peak_bytes']):>6}"
+  )
+
+def _fmt_size(n: int) -> str:
+  for unit in ("B", "K", "M", "G"):
+    if abs(n) < 1024 or unit == "G":
+      return f"{n:.0f}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+    n /= 1024
+
+def _parse_size(s: str) -> int:
+  s = s.strip().upper().rstrip("B")
+  mult = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}.get(s[-1:], 1)
+  return int(s[:-1] if mult > 1 else s) * mult
+
+def _environment() -> dict:
+  commit = None
+  try:
+    from subprocess import run as sp_run
+    commit = sp_run(
+      ["git", "rev-parse", "HEAD"],
+      capture_output=True, text=True,
+      cwd=os.path.dirname(os.path.abspath(__file__))
+    ).stdout.strip() or None
+  except OSError:
+    pass
+  return {
+    "python": platform.python_version(),
+    "implementation": platform.python_implementation(),
+    "platform": platform.platform(),
+    "commit": commit,
+  }
+
+
+"""
+  FOR CLI ONLY
+"""
+class Defaults:
+  SIZES = "64,4K,1M,100M"
+  OUTPUT_FILEPATH = None
+  MIN_TIME = 0.2
+  SEED = 0
+
+def main(
+    sizes: List[int],
+    outputFilePath: Optional[str] = None,
+    compareFilePath: Optional[str] = None,
+    grep: Optional[str] = None,
+    minTime: float = Defaults.MIN_TIME,
+    seed: int = Defaults.SEED,
+  ) -> int:
+  results = run(sizes, grep=grep, min_time=minTime, seed=seed)
+  report = {
+    "environment": _environment(),
+    "sizes": sizes,
+    "results": results,
+  }
+  if compareFilePath:
+    with open(compareFilePath, 'r', encoding='utf8') as fi:
+      baseline = json.load(fi)
+    report["comparison"] = compare(results, baseline["results"])
+    for c in report["comparison"]:
+      print(
+        f"{c['kind']:<10} {c['name']:<26} {_fmt_size(c['size']):>6} " + \
+        f"x{c['speedup']:.2f} speed x{c['peak_ratio']:.2f} peak",
+        file=sys.stderr
+      )
+  if outputFilePath:
+    with open(outputFilePath, 'w', encoding='utf8') as fo:
+      json.dump(report, fo, indent=2)
+  else:
+    json.dump(report, sys.stdout, indent=2)
+  return 1 if any("error" in r for r in results) else 0
+
+def mainargs(*args, **kwargs):
+  from argparse import ArgumentParser
+  parser = ArgumentParser(description="Benchmark cyber_chef ingredients and recipes")
+  parser.add_argument(
+    "-s",
+    "--sizes",
+    default=Defaults.SIZES,
+    dest="sizes",
+    help=f"comma separated payload sizes, default: {Defaults.SIZES}",
+  )
+  parser.add_argument(
+    "-o",
+    "--output",
+    default=Defaults.OUTPUT_FILEPATH,
+    dest="output",
+    help="output json file path, default: stdout",
+  )
+  parser.add_argument(
+    "-c",
+    "--compare",
+    default=None,
+    dest="compare",
+    help="json results of a previous run to compare with",
+  )
+  parser.add_argument(
+    "-g",
+    "--grep",
+    default=None,
+    dest="grep",
+    help="only run entries whose name contains this string",
+  )
+  parser.add_argument(
+    "-t",
+    "--min-time",
+    default=Defaults.MIN_TIME,
+    type=float,
+    dest="min_time",
+    help=f"seconds spent timing each entry and size, default: {Defaults.MIN_TIME}",
+  )
+  parser.add_argument(
+    "--seed",
+    default=Defaults.SEED,
+    type=int,
+    dest="seed",
+    help=f"seed of the generated payloads, default: {Defaults.SEED}",
+  )
+  _args = parser.parse_args(args)
+  return {
+    "sizes": kwargs.get('sizes', [_parse_size(s) for s in _args.sizes.split(',')]),
+    "outputFilePath": kwargs.get('outputFilePath', _args.output),
+    "compareFilePath": kwargs.get('compareFilePath', _args.compare),
+    "grep": kwargs.get('grep', _args.grep),
+    "minTime": kwargs.get('minTime', _args.min_time),
+    "seed": kwargs.get('seed', _args.seed),
+  }
+
+if __name__ == "__main__":
+  sys.exit(main(**mainargs(*sys.argv[1:])))
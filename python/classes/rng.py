@@ -1,9 +1,17 @@
 import random as _random
-from typing import Tuple, Sequence, Optional, Union
+from array import array
+from hashlib import sha512
+from heapq import heapify, heapreplace, nlargest
+from itertools import accumulate, islice
+from math import exp, floor, fsum, log
+from os import urandom
+from typing import Any, Callable, Iterable, Tuple, Sequence, Optional, Union
 
 Weight = Union[int, float]
 RndOutcome = Tuple["T", Weight]
 
+_EMPTY = object()
+
 def random() -> float:
     """
     Generate a random float in the range [0, 1)
@@ -15,7 +23,7 @@ def random() -> float:
     Returns:
     float: Random float in the range [0, 1)
     """
-    return _random.random()
+    return _default_context.random()
 
 def rndbetween(from_: int, to: int) -> int:
     """
@@ -32,7 +40,7 @@ def rndbetween(from_: int, to: int) -> int:
     Returns:
     int: Random integer between from_ and to.
     """
-    return _random.randint(from_, to)
+    return _default_context.rndbetween(from_, to)
 
 def rndindexw(
         seq: Sequence, 
@@ -52,7 +60,7 @@ def rndindexw(
     Returns:
     int: The index of the chosen element in seq.
     """
-    return _random.choices(list(range(len(seq))), weights, k=1)[0]
+    return _default_context.rndindexw(seq, weights)
 
 def rndindexesw(
         seq: Sequence, 
@@ -74,7 +82,7 @@ def rndindexesw(
     Returns:
     list[int]: The indexes of the chosen elements in seq.
     """
-    return _random.choices(list(range(len(seq))), weights, k=k)
+    return _default_context.rndindexesw(seq, weights, k)
 
 def rndindex(seq: Sequence) -> int:
     """
@@ -93,10 +101,7 @@ def rndindex(seq: Sequence) -> int:
     Raises:
     IndexError: If seq is empty.
     """
-    ls = len(seq)
-    if ls == 0:
-        raise IndexError("Cannot get a random index from an empty sequence")
-    return rndbetween(0, ls - 1)
+    return _default_context.rndindex(seq)
 
 def rndindexes(seq: Sequence, k: int) -> Sequence[int]:
     """
@@ -116,10 +121,7 @@ def rndindexes(seq: Sequence, k: int) -> Sequence[int]:
     Raises:
     IndexError: If seq is empty.
     """
-    ls = len(seq)
-    if ls == 0:
-        raise IndexError("Cannot get a random index from an empty sequence")
-    return [rndbetween(0, ls - 1) for _ in range(k)]
+    return _default_context.rndindexes(seq, k)
     
 def rnditem(seq: Sequence["T"]) -> "T":
     """
@@ -135,7 +137,7 @@ def rnditem(seq: Sequence["T"]) -> "T":
     Returns:
     "T": The chosen element from seq.
     """
-    return seq[rndindex(seq)]
+    return _default_context.rnditem(seq)
 
 def rnditems(seq: Sequence["T"], k: int) -> Sequence["T"]:
     """
@@ -152,7 +154,7 @@ def rnditems(seq: Sequence["T"], k: int) -> Sequence["T"]:
     Returns:
     list["T"]: The chosen elements from seq.
     """
-    return [seq[i] for i in rndindexes(seq, k)]
+    return _default_context.rnditems(seq, k)
 
 def rnditemw(seq: Sequence["T"], weights: Sequence[Weight]) -> "T":
     """
@@ -169,7 +171,7 @@ def rnditemw(seq: Sequence["T"], weights: Sequence[Weight]) -> "T":
     Returns:
     "T": The chosen element from seq.
     """
-    return seq[rndindexw(seq, weights)]
+    return _default_context.rnditemw(seq, weights)
 
 def rnditemsw(seq: Sequence["T"], weights: Sequence[Weight], k: int) -> Sequence["T"]:
     """
@@ -187,12 +189,581 @@ def rnditemsw(seq: Sequence["T"], weights: Sequence[Weight], k: int) -> Sequence
     Returns:
     list["T"]: The chosen elements from seq.
     """
-    return [seq[i] for i in rndindexesw(seq, weights, k)]
+    return _default_context.rnditemsw(seq, weights, k)
+
+def rndindexes_unique(seq: Sequence, k: int) -> Sequence[int]:
+    """
+    Get k distinct random indexes from a sequence (sampling without replacement).
+    
+    Args:
+    seq (Sequence): The sequence to choose from.
+    k (int): The number of indexes to choose.
+    
+    Example:
+    >>> rndindexes_unique(['a', 'b', 'c'], 2)
+    [2, 0]
+    
+    Returns:
+    list[int]: The indexes of the chosen elements in seq.
+    
+    Raises:
+    ValueError: If k is negative or larger than seq.
+    """
+    return _default_context.rndindexes_unique(seq, k)
+
+def rnditems_unique(seq: Sequence["T"], k: int) -> Sequence["T"]:
+    """
+    Get k random elements from a sequence, each index at most once (sampling without replacement).
+    
+    Args:
+    seq (Sequence["T"]): The sequence to choose from.
+    k (int): The number of elements to choose.
+    
+    Example:
+    >>> rnditems_unique(['a', 'b', 'c'], 2)
+    ['c', 'a']
+    
+    Returns:
+    list["T"]: The chosen elements from seq.
+    
+    Raises:
+    ValueError: If k is negative or larger than seq.
+    """
+    return _default_context.rnditems_unique(seq, k)
+
+def rndindexesw_unique(
+        seq: Sequence, 
+        weights: Sequence[Weight], 
+        k: int
+    ) -> Sequence[int]:
+    """
+    Get k distinct random indexes from a sequence, given an associated sequence of weights
+    (weighted sampling without replacement, O(n log k)).
+    
+    Args:
+    seq (Sequence): The sequence to choose from.
+    weights (Sequence[Weight]): A sequence of weights, corresponding to seq.
+    k (int): The number of indexes to choose.
+    
+    Example:
+    >>> rndindexesw_unique(['a', 'b', 'c'], [1, 3, 1], 2)
+    [1, 2]
+    
+    Returns:
+    list[int]: The indexes of the chosen elements in seq.
+    
+    Raises:
+    ValueError: If k is negative or larger than the number of weights greater than zero.
+    """
+    return _default_context.rndindexesw_unique(seq, weights, k)
+
+def rnditemsw_unique(seq: Sequence["T"], weights: Sequence[Weight], k: int) -> Sequence["T"]:
+    """
+    Get k random elements from a sequence, given an associated sequence of weights,
+    each index at most once (weighted sampling without replacement).
+    
+    Args:
+    seq (Sequence["T"]): The sequence to choose from.
+    weights (Sequence[Weight]): A sequence of weights, corresponding to seq.
+    k (int): The number of elements to choose.
+    
+    Example:
+    >>> rnditemsw_unique(['a', 'b', 'c'], [1, 3, 1], 2)
+    ['b', 'c']
+    
+    Returns:
+    list["T"]: The chosen elements from seq.
+    
+    Raises:
+    ValueError: If k is negative or larger than the number of weights greater than zero.
+    """
+    return _default_context.rnditemsw_unique(seq, weights, k)
+
+def reservoir_sample(
+        iterable: Iterable["T"], 
+        k: int, 
+        weight: Optional[Callable[["T"], Weight]] = None
+    ) -> Sequence["T"]:
+    """
+    Get k random elements from an iterable of unknown length, in one pass and O(k) memory
+    (sampling without replacement). Unweighted sampling skips ahead geometrically
+    (Li's algorithm L), weighted sampling keeps the k largest Efraimidis-Spirakis keys (A-Res).
+    
+    Args:
+    iterable (Iterable["T"]): The elements to choose from, consumed once.
+    k (int): The number of elements to choose.
+    weight (Optional[Callable[["T"], Weight]]): A function giving the weight of an element,
+    elements weighing zero or less are never chosen. Defaults to None (unweighted).
+    
+    Example:
+    >>> with open("app.log") as f:
+    ...     reservoir_sample(f, 2)
+    ['GET /index.html 200\n', 'GET /favicon.ico 404\n']
+    
+    Returns:
+    list["T"]: The chosen elements, all of them if there are k or less.
+    
+    Raises:
+    ValueError: If k is negative.
+    """
+    return _default_context.reservoir_sample(iterable, k, weight)
+
+def _numpy():
+    """
+    Get the numpy module if it's installed.
+    
+    Returns:
+    module | None: numpy, or None if it can't be imported.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _generator(generator: Any = None, context: Optional["RngContext"] = None):
+    """
+    Resolve the random source of the bulk functions.
+    
+    Args:
+    generator (Any): A numpy.random.Generator, an int seed or None for the context's generator.
+    context (Optional[RngContext]): The context to draw from by default. Defaults to the module's one.
+    
+    Returns:
+    numpy.random.Generator | random.Random | module: The random source,
+    a random.Random (or the random module itself) when numpy is not installed.
+    """
+    np = _numpy()
+    if generator is None:
+        context = context or _default_context
+        return context._source if np is None else context.numpy_generator()
+    if np is None:
+        if isinstance(generator, int):
+            return _random.Random(generator)
+        if isinstance(generator, _random.Random):
+            return generator
+        raise TypeError("Without numpy the generator can only be None, an int seed or a random.Random")
+    if isinstance(generator, np.random.Generator):
+        return generator
+    return np.random.default_rng(generator)
+
+def rndindexes_bulk(
+        seq: Union[Sequence, int],
+        k: int,
+        weights: Optional[Sequence[Weight]] = None,
+        cum_weights: Optional[Sequence[Weight]] = None,
+        generator: Any = None
+    ):
+    """
+    Get k random indexes from a sequence (or a length) in a single vectorized call,
+    optionally given the weights (or cumulative weights) of each index.
+    
+    Args:
+    seq (Union[Sequence, int]): The sequence to choose from, or its length.
+    k (int): The number of indexes to choose.
+    weights (Optional[Sequence[Weight]]): A sequence of weights, corresponding to seq.
+    cum_weights (Optional[Sequence[Weight]]): Cumulative weights, instead of weights.
+    generator (Any): A seeded numpy.random.Generator or an int seed for reproducibility.
+    
+    Example:
+    >>> rndindexes_bulk(['a', 'b', 'c'], 5, generator=42)
+    array([0, 2, 1, 1, 2])
+    
+    Returns:
+    numpy.ndarray | array.array: The indexes, an array.array('q') when numpy is not installed.
+    
+    Raises:
+    IndexError: If seq is empty.
+    ValueError: If the total weight is not greater than zero.
+    """
+    return _default_context.rndindexes_bulk(seq, k, weights, cum_weights, generator)
+
+def rnditems_bulk(
+        seq: Sequence["T"],
+        k: int,
+        weights: Optional[Sequence[Weight]] = None,
+        generator: Any = None,
+        as_indexes: bool = False
+    ):
+    """
+    Get k random elements from a sequence in a single vectorized call,
+    optionally given an associated sequence of weights.
+    
+    Args:
+    seq (Sequence["T"]): The sequence to choose from.
+    k (int): The number of elements to choose.
+    weights (Optional[Sequence[Weight]]): A sequence of weights, corresponding to seq.
+    generator (Any): A seeded numpy.random.Generator or an int seed for reproducibility.
+    as_indexes (bool): If True, return the index array instead of the elements. Defaults to False.
+    
+    Example:
+    >>> rnditems_bulk(['a', 'b', 'c'], 5, [1, 3, 1], generator=42)
+    ['b', 'b', 'c', 'b', 'a']
+    
+    Returns:
+    list["T"] | numpy.ndarray: The chosen elements (an array if seq is an array), or their indexes.
+    """
+    return _default_context.rnditems_bulk(seq, k, weights, generator, as_indexes)
+
+def _alias_table(weights: Sequence[Weight]) -> Tuple[list, list]:
+    """
+    Build a Walker/Vose alias table, to draw weighted indexes in O(1).
+    
+    Args:
+    weights (Sequence[Weight]): The weights of the indexes.
+    
+    Returns:
+    tuple[list[float], list[int]]: The probability of keeping each index and its alias.
+    
+    Raises:
+    ValueError: If the total weight is not greater than zero.
+    """
+    n = len(weights)
+    total = sum(weights)
+    if total <= 0:
+        raise ValueError("Total of weights must be greater than zero")
+    scaled = [w * n / total for w in weights]
+    small = [i for i, p in enumerate(scaled) if p < 1]
+    large = [i for i, p in enumerate(scaled) if p >= 1]
+    prob = [1.0] * n
+    alias = list(range(n))
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] += scaled[s] - 1
+        (small if scaled[l] < 1 else large).append(l)
+    # what's left is 1 up to rounding errors
+    return prob, alias
+
+class RngContext:
+    """
+    An independent random stream, with the methods of the module functions.
+    
+    The module functions use a default context over the random module (so random.seed()
+    still applies to them), a seeded context gives the same results for the same seed
+    and calls. Contexts aren't thread-safe: spawn a child per worker thread or process,
+    children are seeded from a hash of the parent's seed and their spawn path, so they
+    are statistically independent and reproducible, wherever they run.
+    
+    Example:
+    >>> ctx = RngContext(42)
+    >>> workers = ctx.spawn(4)
+    >>> workers[0].rnditemw(['a', 'b', 'c'], [1, 3, 1])
+    'b'
+    >>> workers[0].picker([("outcome1", 1), ("outcome2", 3)]).pick_one()
+    'outcome2'
+    
+    Args:
+    seed (Optional[Union[int, str, bytes]]): The seed of the stream. Defaults to None (seeded from the OS).
+    """
+    def __init__(self, seed: Optional[Union[int, str, bytes]] = None, _path: Tuple[int, ...] = ()):
+        if seed is None:
+            seed = int.from_bytes(urandom(16), 'big')
+        self._seed = seed
+        self._path = tuple(_path)
+        self._spawned = 0
+        self._source = _random.Random(self._derive() if self._path else seed)
+        self._np_generator = None
+
+    @classmethod
+    def _wrap(cls, source) -> "RngContext":
+        """
+        Get a context drawing from an existing source, without a seed of its own.
+        
+        Args:
+        source (random.Random | module): The source, with the methods of random.Random.
+        
+        Returns:
+        RngContext: The context.
+        """
+        ctx = cls.__new__(cls)
+        ctx._seed = None
+        ctx._path = ()
+        ctx._spawned = 0
+        ctx._source = source
+        ctx._np_generator = None
+        return ctx
+
+    def _derive(self, *salt) -> int:
+        """
+        Derive a seed from the context's seed and spawn path.
+        
+        Args:
+        salt (any): Values to tell the derived seeds of a same context apart.
+        
+        Returns:
+        int: The derived seed (512 bits).
+        """
+        return int.from_bytes(sha512(repr((self._seed, self._path, *salt)).encode()).digest(), 'big')
+
+    def spawn(self, n: int = 1) -> list:
+        """
+        Get independent child contexts, reproducible from the seed and the number of children spawned before.
+        
+        Args:
+        n (int): The number of children. Defaults to 1.
+        
+        Returns:
+        list[RngContext]: The children.
+        """
+        if self._seed is None:
+            # the module's context draws a new seed, reproducible after random.seed()
+            return [RngContext(self._source.getrandbits(128), (i,)) for i in range(n)]
+        children = [
+            RngContext(self._seed, self._path + (i,)) 
+            for i in range(self._spawned, self._spawned + n)
+        ]
+        self._spawned += n
+        return children
+
+    def numpy_generator(self):
+        """
+        Get the numpy Generator of the context, used by the bulk methods.
+        
+        Returns:
+        numpy.random.Generator: The generator, seeded from the context's seed and spawn path.
+        
+        Raises:
+        ImportError: If numpy is not installed.
+        """
+        if self._np_generator is None:
+            np = _numpy()
+            if np is None:
+                raise ImportError("numpy is not installed")
+            self._np_generator = np.random.default_rng(
+                None if self._seed is None else self._derive("numpy")
+            )
+        return self._np_generator
+
+    def picker(self, outcomes: Optional[Sequence[RndOutcome]] = None) -> "RndPicker":
+        """
+        Get a RndPicker drawing from the context.
+        
+        Args:
+        outcomes (Optional[Sequence[RndOutcome]]): A sequence of outcomes and their weights. Defaults to None.
+        
+        Returns:
+        RndPicker: The picker.
+        """
+        return RndPicker(outcomes, self)
+
+    def random(self) -> float:
+        """
+        See :func random:
+        """
+        return self._source.random()
+
+    def rndbetween(self, from_: int, to: int) -> int:
+        """
+        See :func rndbetween:
+        """
+        return self._source.randint(from_, to)
+
+    def rndindexw(
+            self, 
+            seq: Sequence, 
+            weights: Sequence[Weight]
+        ) -> int:
+        """
+        See :func rndindexw:
+        """
+        return self._source.choices(range(len(seq)), weights, k=1)[0]
+
+    def rndindexesw(
+            self, 
+            seq: Sequence, 
+            weights: Sequence[Weight], 
+            k: int
+        ) -> int:
+        """
+        See :func rndindexesw:
+        """
+        return self._source.choices(range(len(seq)), weights, k=k)
+
+    def rndindex(self, seq: Sequence) -> int:
+        """
+        See :func rndindex:
+        """
+        ls = len(seq)
+        if ls == 0:
+            raise IndexError("Cannot get a random index from an empty sequence")
+        return self.rndbetween(0, ls - 1)
+
+    def rndindexes(self, seq: Sequence, k: int) -> Sequence[int]:
+        """
+        See :func rndindexes:
+        """
+        ls = len(seq)
+        if ls == 0:
+            raise IndexError("Cannot get a random index from an empty sequence")
+        return [self.rndbetween(0, ls - 1) for _ in range(k)]
+
+    def rnditem(self, seq: Sequence["T"]) -> "T":
+        """
+        See :func rnditem:
+        """
+        return seq[self.rndindex(seq)]
+
+    def rnditems(self, seq: Sequence["T"], k: int) -> Sequence["T"]:
+        """
+        See :func rnditems:
+        """
+        return [seq[i] for i in self.rndindexes(seq, k)]
+
+    def rnditemw(self, seq: Sequence["T"], weights: Sequence[Weight]) -> "T":
+        """
+        See :func rnditemw:
+        """
+        return seq[self.rndindexw(seq, weights)]
+
+    def rnditemsw(self, seq: Sequence["T"], weights: Sequence[Weight], k: int) -> Sequence["T"]:
+        """
+        See :func rnditemsw:
+        """
+        return [seq[i] for i in self.rndindexesw(seq, weights, k)]
+
+    def rndindexes_unique(self, seq: Sequence, k: int) -> Sequence[int]:
+        """
+        See :func rndindexes_unique:
+        """
+        return self._source.sample(range(len(seq)), k)
+
+    def rnditems_unique(self, seq: Sequence["T"], k: int) -> Sequence["T"]:
+        """
+        See :func rnditems_unique:
+        """
+        return [seq[i] for i in self.rndindexes_unique(seq, k)]
+
+    def _es_key(self, weight: Weight) -> float:
+        """
+        Get an Efraimidis-Spirakis key for a weight, see :func rndindexesw_unique:
+        """
+        return log(1.0 - self._source.random()) / weight
+
+    def rndindexesw_unique(
+            self, 
+            seq: Sequence, 
+            weights: Sequence[Weight], 
+            k: int
+        ) -> Sequence[int]:
+        """
+        See :func rndindexesw_unique:
+        """
+        keys = [(self._es_key(w), i) for i, w in zip(range(len(seq)), weights) if w > 0]
+        if not 0 <= k <= len(keys):
+            raise ValueError("Sample larger than population or is negative")
+        return [i for _, i in nlargest(k, keys)]
+
+    def rnditemsw_unique(self, seq: Sequence["T"], weights: Sequence[Weight], k: int) -> Sequence["T"]:
+        """
+        See :func rnditemsw_unique:
+        """
+        return [seq[i] for i in self.rndindexesw_unique(seq, weights, k)]
+
+    def reservoir_sample(
+            self, 
+            iterable: Iterable["T"], 
+            k: int, 
+            weight: Optional[Callable[["T"], Weight]] = None
+        ) -> Sequence["T"]:
+        """
+        See :func reservoir_sample:
+        """
+        if k < 0:
+            raise ValueError("Sample larger than population or is negative")
+        it = iter(iterable)
+        if weight is None:
+            reservoir = list(islice(it, k))
+            if len(reservoir) < k or not k:
+                return reservoir
+            w = exp(log(1.0 - self._source.random()) / k)
+            while w < 1:
+                skip = floor(log(1.0 - self._source.random()) / log(1 - w))
+                item = next(islice(it, skip, None), _EMPTY)
+                if item is _EMPTY:
+                    break
+                reservoir[int(self._source.random() * k)] = item
+                w *= exp(log(1.0 - self._source.random()) / k)
+            return reservoir
+        heap = []
+        # the counter breaks ties without comparing the elements
+        for n, item in enumerate(it):
+            w = weight(item)
+            if w <= 0:
+                continue
+            key = self._es_key(w)
+            if len(heap) < k:
+                heap.append((key, n, item))
+                if len(heap) == k:
+                    heapify(heap)
+            elif k and key > heap[0][0]:
+                heapreplace(heap, (key, n, item))
+        return [item for _, _, item in sorted(heap, reverse=True)]
+
+    def rndindexes_bulk(
+            self, 
+            seq: Union[Sequence, int],
+            k: int,
+            weights: Optional[Sequence[Weight]] = None,
+            cum_weights: Optional[Sequence[Weight]] = None,
+            generator: Any = None
+        ):
+        """
+        See :func rndindexes_bulk:
+        """
+        n = seq if isinstance(seq, int) else len(seq)
+        if n == 0:
+            raise IndexError("Cannot get a random index from an empty sequence")
+        gen = _generator(generator, self)
+        np = _numpy()
+        if np is None:
+            return array('q', gen.choices(range(n), weights, cum_weights=cum_weights, k=k))
+        if weights is None and cum_weights is None:
+            return gen.integers(0, n, size=k)
+        cum = np.asarray(
+            cum_weights if cum_weights is not None else np.cumsum(weights), 
+            dtype=float
+        )
+        total = cum[-1]
+        if total <= 0:
+            raise ValueError("Total of weights must be greater than zero")
+        # 'right' skips zero weights, minimum guards from rounding up to the total
+        return np.minimum(np.searchsorted(cum, gen.random(k) * total, side='right'), n - 1)
+
+    def rnditems_bulk(
+            self, 
+            seq: Sequence["T"],
+            k: int,
+            weights: Optional[Sequence[Weight]] = None,
+            generator: Any = None,
+            as_indexes: bool = False
+        ):
+        """
+        See :func rnditems_bulk:
+        """
+        indexes = self.rndindexes_bulk(seq, k, weights, generator=generator)
+        if as_indexes:
+            return indexes
+        np = _numpy()
+        if np is not None and isinstance(seq, np.ndarray):
+            return seq[indexes]
+        return list(map(seq.__getitem__, indexes.tolist()))
+
+_default_context = RngContext._wrap(_random)
 
 class RndPicker:
     """
     A class for randomly picking outcomes with a certain weight.
     
+    Outcomes are indexed by slot (a dict from outcome to slot, and parallel lists of
+    outcomes and weights), with a Fenwick tree over the weights: lookups are O(1),
+    weight updates, additions and removals O(log n) (amortized, removed slots are
+    compacted once they're the majority) and outcomes must be hashable.
+    Weighted picks descend the Fenwick tree (O(log n)) right after a change, and
+    switch to an alias table (O(1) per pick) once it has been paid off by as many
+    picks without changes as there are outcomes.
+    
     Example:
     >>> rp = RndPicker([("outcome1", 1), ("outcome2", 3)])
     >>> rp.pick_one()
@@ -200,9 +771,27 @@ class RndPicker:
     
     Args:
     outcomes (Optional[Sequence[RndOutcome]]): A sequence of outcomes and their weights. Defaults to None.
+    rng (Optional[RngContext]): The random stream to draw from. Defaults to the module's one.
     """
-    def __init__(self, outcomes: Optional[Sequence[RndOutcome]] = None):
-        self._outcomes = [*(outcomes or [])]
+    def __init__(
+            self, 
+            outcomes: Optional[Sequence[RndOutcome]] = None, 
+            rng: Optional[RngContext] = None
+        ):
+        self._rng = rng or _default_context
+        self._slots = {}
+        self._results = []
+        self._weights = []
+        for result, weight in outcomes or []:
+            # last weight wins, as when setting the same outcome twice
+            if result in self._slots:
+                self._weights[self._slots[result]] = weight
+                continue
+            self._slots[result] = len(self._results)
+            self._results.append(result)
+            self._weights.append(weight)
+        self._dead = 0
+        self._build_tree()
     
     def __getitem__(self, k):
         """
@@ -213,8 +802,14 @@ class RndPicker:
         
         Returns:
         Weight: The weight of the outcome.
+        
+        Raises:
+        ValueError: If the outcome doesn't exist.
         """
-        return self._outcomes[self.results.index(k)][1]
+        try:
+            return self._weights[self._slots[k]]
+        except KeyError:
+            raise ValueError("Outcome not found") from None
 
     def __setitem__(self, k, v):
         """
@@ -224,12 +819,14 @@ class RndPicker:
         k (any): The outcome to change.
         v (Weight): The new weight of the outcome.
         """
-        try:
-            ir = self.results.index(k)
-        except ValueError:
+        slot = self._slots.get(k)
+        if slot is None:
             self.add_outcome(k, v)
             return
-        self._outcomes[ir] = (k, v)
+        self._tree_add(slot, v - self._weights[slot])
+        self._positive += (v > 0) - (self._weights[slot] > 0)
+        self._weights[slot] = v
+        self._changed()
         
     def __len__(self):
         """
@@ -238,7 +835,154 @@ class RndPicker:
         Returns:
         int: The number of outcomes.
         """
-        return len(self._outcomes)
+        return len(self._slots)
+
+    def __contains__(self, k):
+        """
+        Check if an outcome exists.
+        
+        Args:
+        k (any): The outcome to look for.
+        
+        Returns:
+        bool: True if the outcome exists, False otherwise.
+        """
+        return k in self._slots
+
+    def _changed(self):
+        """
+        Drop the alias table after a change, picks fall back to the Fenwick tree.
+        """
+        self._tables = None
+        self._picks = 0
+
+    def _build_tree(self):
+        """
+        Build the Fenwick tree of the weights in O(n), and count the positive ones.
+        """
+        n = len(self._weights)
+        self._positive = sum(w > 0 for w in self._weights)
+        tree = [0, *self._weights]
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                tree[j] += tree[i]
+        self._tree = tree
+        self._changed()
+
+    def _tree_add(self, slot: int, delta: Weight):
+        """
+        Add delta to the weight of a slot in the Fenwick tree.
+        
+        Args:
+        slot (int): The slot to change.
+        delta (Weight): The difference of weight.
+        """
+        tree = self._tree
+        i = slot + 1
+        n = len(tree)
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def _tree_prefix(self, slot: int) -> Weight:
+        """
+        Get the total weight of the slots before a slot.
+        
+        Args:
+        slot (int): The (excluded) end slot.
+        
+        Returns:
+        Weight: The total weight of the slots [0, slot).
+        """
+        tree = self._tree
+        total = 0
+        while slot:
+            total += tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def _tree_find(self, r: Weight) -> int:
+        """
+        Descend the Fenwick tree to the slot where a cumulative weight falls.
+        
+        Args:
+        r (Weight): A cumulative weight in [0, total weight).
+        
+        Returns:
+        int: The slot of the outcome covering r, len(slots) if r is past the total.
+        """
+        tree = self._tree
+        n = len(tree) - 1
+        pos = 0
+        step = 1 << n.bit_length() - 1 if n else 0
+        while step:
+            nxt = pos + step
+            if nxt <= n and tree[nxt] <= r:
+                pos = nxt
+                r -= tree[nxt]
+            step >>= 1
+        return pos
+
+    def _compact(self):
+        """
+        Drop the slots of removed outcomes and rebuild the index.
+        """
+        if not self._dead:
+            return
+        live = [(r, w) for r, w in zip(self._results, self._weights) if r is not _EMPTY]
+        self._results = [r for r, _ in live]
+        self._weights = [w for _, w in live]
+        self._slots = {r: i for i, r in enumerate(self._results)}
+        self._dead = 0
+        self._build_tree()
+
+    def _get_tables(self) -> tuple:
+        """
+        Get the outcomes, cumulative weights and alias table, building them if outdated.
+        
+        Returns:
+        tuple: (results, cumulative weights, alias probabilities, aliases)
+        
+        Raises:
+        IndexError: If there are no outcomes.
+        """
+        if self._tables is None:
+            if not self._slots:
+                raise IndexError("Cannot pick from a RndPicker without outcomes")
+            self._compact()
+            weights = self._weights
+            cum_weights = list(accumulate(weights))
+            self._tables = (self._results, cum_weights, *_alias_table(weights))
+        return self._tables
+
+    def _pick_slot_w(self) -> int:
+        """
+        Pick the slot of one outcome using the Fenwick tree.
+        
+        Returns:
+        int: The picked slot.
+        
+        Raises:
+        IndexError: If there are no outcomes.
+        ValueError: If the total weight is not greater than zero.
+        """
+        if not self._slots:
+            raise IndexError("Cannot pick from a RndPicker without outcomes")
+        # the tree total can keep a float residue once all weights are zero
+        if not self._positive:
+            raise ValueError("Total of weights must be greater than zero")
+        n = len(self._weights)
+        for _ in range(2):
+            total = self._tree_prefix(n)
+            if total > 0:
+                slot = self._tree_find(self._rng._source.random() * total)
+                if slot < n and self._weights[slot] > 0:
+                    return slot
+            # float deltas drifted the tree from the weights: rebuild it
+            self._build_tree()
+        # rounding past the end of an exact tree: the last positive slot
+        return max(i for i, w in enumerate(self._weights) if w > 0)
 
     def _pick_one_w(self):
         """
@@ -247,7 +991,13 @@ class RndPicker:
         Returns:
         any: The picked outcome.
         """
-        return rnditemw(self.results, self.weights)
+        if self._tables is None:
+            self._picks += 1
+            if self._picks <= len(self._slots):
+                return self._results[self._pick_slot_w()]
+        results, _, prob, alias = self._get_tables()
+        i = int(self._rng._source.random() * len(results))
+        return results[i] if self._rng._source.random() < prob[i] else results[alias[i]]
     
     def _pick_one_u(self):
         """
@@ -256,7 +1006,14 @@ class RndPicker:
         Returns:
         any: The picked outcome.
         """
-        return rnditem(self.results)
+        if not self._slots:
+            raise IndexError("Cannot choose from an empty sequence")
+        results = self._results
+        # removed slots are at most half of them
+        while True:
+            result = results[int(self._rng._source.random() * len(results))]
+            if result is not _EMPTY:
+                return result
     
     def _pick_many_w(self, k: int):
         """
@@ -268,7 +1025,11 @@ class RndPicker:
         Returns:
         list[any]: The picked outcomes.
         """
-        return rnditemsw(self.results, self.weights, k)
+        if self._tables is None and k < len(self._slots):
+            results = self._results
+            return [results[self._pick_slot_w()] for _ in range(k)]
+        results, cum_weights, _, _ = self._get_tables()
+        return self._rng._source.choices(results, cum_weights=cum_weights, k=k)
     
     def _pick_many_u(self, k: int):
         """
@@ -280,7 +1041,44 @@ class RndPicker:
         Returns:
         list[any]: The picked outcomes.
         """
-        return rnditems(self.results, k)
+        return self._rng.rnditems(self.results, k)
+
+    def pick_many_bulk(
+            self, 
+            k: int, 
+            weighted: bool = True, 
+            generator: Any = None, 
+            as_indexes: bool = False
+        ):
+        """
+        Pick k outcomes in a single vectorized call, see :func rnditems_bulk:
+        
+        Args:
+        k (int): The number of outcomes to pick.
+        weighted (bool): If True, use the weights to pick the outcomes. If False, ignore the weights. Defaults to True.
+        generator (Any): A seeded numpy.random.Generator or an int seed for reproducibility.
+        as_indexes (bool): If True, return the indexes in :method keys: instead of the outcomes. Defaults to False.
+        
+        Returns:
+        list[any] | numpy.ndarray: The picked outcomes, or their indexes.
+        """
+        if weighted:
+            results, cum_weights, _, _ = self._get_tables()
+        else:
+            # the weights (and their tables) may be invalid, eg all zero
+            if not self._slots:
+                raise IndexError("Cannot pick from a RndPicker without outcomes")
+            self._compact()
+            results, cum_weights = self._results, None
+        indexes = self._rng.rndindexes_bulk(
+            len(results), 
+            k, 
+            cum_weights=cum_weights, 
+            generator=generator
+        )
+        if as_indexes:
+            return indexes
+        return list(map(results.__getitem__, indexes.tolist()))
 
     def keys(self):
         """
@@ -307,7 +1105,7 @@ class RndPicker:
         Returns:
         generator: A generator of tuples, where each tuple is an outcome and its weight.
         """
-        return ((k, v) for k, v in zip(self.results, self.weights))
+        return ((k, v) for k, v in zip(self._results, self._weights) if k is not _EMPTY)
         
     @property 
     def outcomes(self):
@@ -317,7 +1115,7 @@ class RndPicker:
         Returns:
         list[RndOutcome]: The outcomes and their weights.
         """
-        return self._outcomes
+        return list(self.items())
     
     @property
     def weights(self):
@@ -327,7 +1125,9 @@ class RndPicker:
         Returns:
         list[Weight]: The weights.
         """
-        return list(map(lambda o: o[1], self._outcomes))
+        if not self._dead:
+            return self._weights[:]
+        return [w for r, w in zip(self._results, self._weights) if r is not _EMPTY]
     
     @property
     def results(self):
@@ -337,7 +1137,9 @@ class RndPicker:
         Returns:
         list[any]: The outcomes.
         """
-        return list(map(lambda o: o[0], self._outcomes))
+        if not self._dead:
+            return self._results[:]
+        return [r for r in self._results if r is not _EMPTY]
     
     @property
     def total_weight(self) -> Weight:
@@ -347,7 +1149,11 @@ class RndPicker:
         Returns:
         Weight: The total weight.
         """
-        return sum(self.weights)
+        # exact: the tree accumulates the rounding errors of float deltas
+        weights = self._weights
+        if all(isinstance(w, int) for w in weights):
+            return sum(weights)
+        return fsum(weights)
     
     @property
     def equal_weights(self) -> bool:
@@ -386,9 +1192,17 @@ class RndPicker:
         Raises:
         ValueError: If the outcome already exists.
         """
-        if result in self.results:
+        if result in self._slots:
             raise ValueError("Outcome already existing (use set())")
-        self._outcomes.append((result, weight))
+        slot = len(self._results)
+        self._slots[result] = slot
+        self._results.append(result)
+        self._weights.append(weight)
+        self._positive += weight > 0
+        # the new node covers (slot + 1 - lowbit, slot + 1]
+        i = slot + 1
+        self._tree.append(weight + self._tree_prefix(slot) - self._tree_prefix(i - (i & -i)))
+        self._changed()
         return self
     
     def set_outcome(self, result: "T", weight: Weight, upsert: bool = True) -> "RndPicker":
@@ -406,7 +1220,7 @@ class RndPicker:
         Raises:
         IndexError: If upsert is False and the outcome doesn't exist.
         """
-        if not upsert and result in self.results:
+        if not upsert and result not in self._slots:
             raise IndexError("Outcome not found")
         self[result] = weight
         return self
@@ -425,13 +1239,20 @@ class RndPicker:
         Raises:
         IndexError: If raise_ is True and the outcome doesn't exist.
         """
-        try:
-            ir = self.results.index(result)
-        except ValueError:
+        slot = self._slots.pop(result, None)
+        if slot is None:
             if raise_:
                 raise IndexError("Outcome not found")
             return self
-        self._outcomes.pop(ir)
+        self._tree_add(slot, -self._weights[slot])
+        self._positive -= self._weights[slot] > 0
+        self._results[slot] = _EMPTY
+        self._weights[slot] = 0
+        self._dead += 1
+        if self._dead * 2 > len(self._results):
+            self._compact()
+        else:
+            self._changed()
         return self
     
     def pick_one(self, weighted: bool = True):
@@ -448,17 +1269,25 @@ class RndPicker:
             return self._pick_one_w()
         return self._pick_one_u()
     
-    def pick_many(self, k: int, weighted: bool = True):
+    def pick_many(self, k: int, weighted: bool = True, replace: bool = True):
         """
         Pick k outcomes.
         
         Args:
         k (int): The number of outcomes to pick.
         weighted (bool): If True, use the weights to pick the outcomes. If False, ignore the weights. Defaults to True.
+        replace (bool): If False, pick each outcome at most once. Defaults to True.
         
         Returns:
         list[any]: The picked outcomes.
+        
+        Raises:
+        ValueError: If replace is False and there are less than k outcomes to pick (weighing more than zero if weighted).
         """
+        if not replace:
+            if weighted:
+                return self._rng.rnditemsw_unique(self.results, self.weights, k)
+            return self._rng.rnditems_unique(self.results, k)
         if weighted:
             return self._pick_many_w(k)
         return self._pick_many_u(k)
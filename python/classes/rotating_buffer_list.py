@@ -1,12 +1,172 @@
-from typing import Iterable
+from array import array
+from collections import deque
+import json
+import mmap
+import os
+import struct
+from itertools import islice
+from math import fsum, isnan, nan, sqrt
+from queue import Empty
+from threading import Event
+from time import monotonic
+from typing import Callable, Iterable
+
+
+class RollingStats:
+    """
+    Statistics of the items in a RotatingBufferList window
+    (the items pushed and neither popped nor replaced yet),
+    updated on each append and pop without scanning the buffer:
+    running sum, Welford mean and variance, 
+    monotonic deques of (sequence number, item) for min and max.
+    A pop invalidates the deques, they are rebuilt from 
+    :param window: on the next read of min or max
+    """
+    def __init__(self, window : Callable[[], Iterable]):
+        self._window = window
+        self._n = 0
+        self._sum = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        # sequence numbers of the eldest and of the next item
+        self._head = 0
+        self._tail = 0
+        self._mins = deque()
+        self._maxs = deque()
+        self._stale = False
+    
+    @property
+    def count(self):
+        """
+        Number of items in the window
+        """
+        return self._n
+    
+    @property
+    def sum(self):
+        """
+        Sum of the items in the window
+        """
+        return self._sum
+    
+    @property
+    def mean(self):
+        """
+        Mean of the items in the window, nan if empty
+        """
+        return self._mean if self._n else nan
+    
+    @property
+    def variance(self):
+        """
+        Population variance of the items in the window, nan if empty
+        """
+        return max(self._m2, 0.0) / self._n if self._n else nan
+    
+    @property
+    def stdev(self):
+        """
+        Population standard deviation of the items in the window, nan if empty
+        """
+        return sqrt(self.variance)
+    
+    @property
+    def min(self):
+        """
+        Minimum of the items in the window, raises ValueError if empty
+        """
+        return self._extreme(self._mins, "min")
+    
+    @property
+    def max(self):
+        """
+        Maximum of the items in the window, raises ValueError if empty
+        """
+        return self._extreme(self._maxs, "max")
+    
+    def _extreme(self, monotonic, name):
+        if not self._n:
+            raise ValueError(f"{name} of an empty window")
+        if self._stale:
+            self._rebuild()
+        return monotonic[0][1]
+    
+    def _rebuild(self):
+        self._mins.clear()
+        self._maxs.clear()
+        self._stale = False
+        for seq, item in enumerate(self._window(), self._head):
+            self._track(seq, item)
+    
+    def _track(self, seq, item):
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] >= item:
+            mins.pop()
+        mins.append((seq, item))
+        while maxs and maxs[-1][1] <= item:
+            maxs.pop()
+        maxs.append((seq, item))
+    
+    def _push(self, item):
+        """
+        Newest :param item: added to the window
+        """
+        self._n += 1
+        self._sum += item
+        delta = item - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (item - self._mean)
+        if not self._stale:
+            self._track(self._tail, item)
+        self._tail += 1
+    
+    def _remove(self, item):
+        self._n -= 1
+        if not self._n:
+            # start over, dropping the rounding errors
+            self._sum, self._mean, self._m2 = 0, 0.0, 0.0
+            return
+        self._sum -= item
+        delta = item - self._mean
+        self._mean -= delta / self._n
+        self._m2 -= delta * (item - self._mean)
+    
+    def _evict(self, item):
+        """
+        Eldest :param item: replaced by a newer one
+        """
+        self._remove(item)
+        self._head += 1
+        if not self._stale:
+            for monotonic in (self._mins, self._maxs):
+                if monotonic and monotonic[0][0] < self._head:
+                    monotonic.popleft()
+    
+    def _pop(self, item):
+        """
+        Newest :param item: popped
+        """
+        self._remove(item)
+        self._tail -= 1
+        # the items it shadowed in the deques are gone
+        self._stale = True
+
 
 class RotatingBufferList:
-    def __init__(self, size : int, initial_value : Iterable, filler = None):
+    def __init__(
+        self, 
+        size : int, 
+        initial_value : Iterable, 
+        filler = None, 
+        track_stats : bool = False
+    ):
         self.filler = filler
         self._size = size
-        self._mem = [filler for _ in range(size)]
+        self._mem = self._alloc(size, filler)
         self._ptr = 0
         self._clock = 0
+        self._count = 0
+        self._stats = RollingStats(self._occupied) if track_stats else None
         self.extend(initial_value)
     
     @property
@@ -23,6 +183,22 @@ class RotatingBufferList:
         """
         return self._clock
     
+    @property
+    def stats(self):
+        """
+        :class RollingStats: of the items pushed and neither popped
+        nor replaced yet, None unless created with track_stats
+        """
+        return self._stats
+    
+    @property
+    def occupancy(self):
+        """
+        Number of items pushed and neither popped
+        nor replaced yet (the others are empty), O(1)
+        """
+        return self._count
+    
     @property
     def unreal_length(self):
         """
@@ -33,21 +209,25 @@ class RotatingBufferList:
 
     def empty_items(self):
         """
-        Indexes of items that equal filler
+        Indexes of empty items (never pushed, popped or cleared),
+        from the occupancy, without comparing items
         """
-        return [
-            i for i, itm in
-            enumerate(self) if itm == self.filler
-        ]
+        start, end = self._occupied_indexes()
+        size = self._size
+        if end <= size:
+            return [*range(start), *range(end, size)]
+        return list(range(end - size, start))
 
     def non_empty_items(self):
         """
-        Items of items that not equal filler 
+        Indexes of items that are not empty,
+        from the occupancy, without comparing items
         """
-        return [
-            i for i, itm in
-            enumerate(self) if itm != self.filler
-        ]
+        start, end = self._occupied_indexes()
+        size = self._size
+        if end <= size:
+            return list(range(start, end))
+        return [*range(end - size), *range(start, size)]
 
     def extend(self, *args):
         """
@@ -68,11 +248,10 @@ class RotatingBufferList:
     def push(self, *args):
         """
         Append each argument.
-        It's literally calling :method append:
-        for each argument passed
+        Same as calling :method append:
+        for each argument passed, in bulk
         """
-        for arg in args:
-            self._append(arg)
+        self._extend(args)
     
     def write(self, *args):
         """
@@ -92,10 +271,7 @@ class RotatingBufferList:
         Return a list of length :param n int: 
         cycling the buffered items
         """
-        return [
-            self.__getitem__(i) 
-            for i in range(n)
-        ]
+        return self._read(0, n)
     
     def infinite_iterator(self):
         """
@@ -106,6 +282,7 @@ class RotatingBufferList:
     def clear(self):
         """
         Replace all the buffer memory with the filler
+        (and reset the stats)
         """
         return self.fill(self.filler, force = True)
     
@@ -113,28 +290,99 @@ class RotatingBufferList:
         """
         Fill the buffer memory with :param with_:
         If not forced, the :method fill: will only operate
-        on empty items (ie items which match the filler)
+        on empty items (see :property occupancy:)
+        Filled items are not empty, unless :param with_: is the filler.
+        Stats are computed again from the items that are not empty
         """
+        size = self._size
+        occupied = not self._is_filler(with_)
         if force:
-            for i in range(len(self._mem)):
-                self._mem[i] = with_
+            self._mem[:] = self._coerce([with_] * size)
         else:
-            for i in range(len(self._mem)):
-                if self._mem[i] == self.filler:
-                    self._mem[i] = with_
+            # the empty items follow the occupied ones
+            n = size - self._count
+            start = self._ptr
+            end = start + n
+            if end <= size:
+                self._mem[start:end] = self._coerce([with_] * n)
+            else:
+                self._mem[start:] = self._coerce([with_] * (size - start))
+                self._mem[:end - size] = self._coerce([with_] * (end - size))
+            if not occupied:
+                return
+        self._set_position(self._ptr, self._clock, size if occupied else 0)
+        if self._stats is not None:
+            self._stats = RollingStats(self._occupied)
+            for item in self._occupied():
+                self._stats._push(item)
+    
+    def _alloc(self, size, filler):
+        """
+        The buffer memory, :param size: items set to :param filler:
+        """
+        return [filler for _ in range(size)]
+    
+    def _coerce(self, items):
+        """
+        Items converted to what slices of the buffer memory accept
+        """
+        return items
+    
+    def _join(self, a, b):
+        """
+        Concatenation of two slices of the buffer memory
+        """
+        return a + b
+    
+    def _repeat(self, a, n):
+        """
+        Slice of the buffer memory repeated :param n: times
+        """
+        return a * n
+    
+    def _copy(self, a):
+        """
+        Slice of the buffer memory detached from it (slices of lists are copies)
+        """
+        return a
+    
+    def _is_filler(self, item):
+        """
+        Whether :param item: is an empty item
+        """
+        return item == self.filler
     
     def _first_index(self):
         return self._ptr if self._clock else 0
     
+    def _occupied_indexes(self):
+        """
+        Start and end (maybe past the size, then cycling)
+        of the indexes of the items that are not empty:
+        in memory they are the :attr _count: items before the pointer
+        """
+        start = (self._ptr - self._count - self._first_index()) % self._size
+        return start, start + self._count
+    
     def _decrement_ptr(self):
-        if self._ptr == 0:
-            self._clock -= 1
-        self._ptr = self._prev_ptr(self._ptr)
+        clock = self._clock - 1 if self._ptr == 0 else self._clock
+        self._set_position(self._prev_ptr(self._ptr), clock, max(self._count - 1, 0))
     
     def _increment_ptr(self):
-        self._ptr = self._next_ptr(self._ptr)
-        if self._ptr == 0:
-            self._clock += 1
+        ptr = self._next_ptr(self._ptr)
+        self._set_position(
+            ptr, 
+            self._clock + 1 if ptr == 0 else self._clock, 
+            min(self._count + 1, self._size)
+        )
+    
+    def _set_position(self, ptr, clock, count):
+        """
+        Move the pointer, the clock and the occupancy together
+        """
+        self._ptr = ptr
+        self._clock = clock
+        self._count = count
     
     def _next_ptr(self, ptr):
         return (ptr + 1) % self._size
@@ -143,10 +391,94 @@ class RotatingBufferList:
         return (ptr - 1) % self._size
     
     def _extend(self, iterable):
-        for item in iterable:
-            self._append(item)
+        if self._stats is not None:
+            # each replaced item leaves the stats
+            for item in iterable:
+                self._append(item)
+            return
+        if isinstance(iterable, (list, tuple)):
+            self._write(iterable)
+            return
+        # unknown length: write chunks of at most a buffer size
+        iterator = iter(iterable)
+        while True:
+            chunk = list(islice(iterator, self._size))
+            if not chunk:
+                return
+            self._write(chunk)
+    
+    def _write(self, items):
+        """
+        Bulk append of a list or tuple: at most two slice assignments,
+        only the last :property size: items are written
+        """
+        size, n = self._size, len(items)
+        if not n:
+            return
+        unreal = self.unreal_length + n
+        ptr = unreal % size
+        if n > size:
+            items = items[n - size:]
+        items = self._coerce(items)
+        if n >= size:
+            # the eldest of the last items lands on the new pointer
+            self._mem[ptr:] = items[:size - ptr]
+            self._mem[:ptr] = items[size - ptr:]
+        else:
+            start = self._ptr
+            end = start + n
+            if end <= size:
+                self._mem[start:end] = items
+            else:
+                self._mem[start:] = items[:size - start]
+                self._mem[:end - size] = items[size - start:]
+        clock, ptr = divmod(unreal, size)
+        self._set_position(ptr, clock, min(self._count + n, size))
+    
+    def _occupied(self):
+        """
+        The items pushed and neither popped nor replaced yet,
+        eldest first: they are the :attr _count: before the pointer
+        """
+        n, size = self._count, self._size
+        start = (self._ptr - n) % size
+        end = start + n
+        if end <= size:
+            return self._copy(self._mem[start:end])
+        return self._join(self._mem[start:], self._mem[:end - size])
+    
+    def _ordered(self, offset = 0):
+        """
+        The buffer memory from the item at :param offset:
+        (0 is the eldest), with at most two slices
+        """
+        first = (self._first_index() + offset) % self._size
+        return self._join(self._mem[first:], self._mem[:first])
+    
+    def _read(self, offset, n):
+        """
+        :param n: items cycling the buffer from :param offset:,
+        with at most two slices (then repeating them)
+        """
+        if n <= 0:
+            return self._copy(self._mem[:0])
+        size = self._size
+        start = (self._first_index() + offset) % size
+        end = start + n
+        if end <= size:
+            return self._copy(self._mem[start:end])
+        if n <= size:
+            return self._join(self._mem[start:], self._mem[:end - size])
+        rounds, rest = divmod(n, size)
+        ordered = self._ordered(offset)
+        return self._join(self._repeat(ordered, rounds), ordered[:rest])
     
     def _append(self, arg):
+        stats = self._stats
+        if stats is not None:
+            if stats.count == self._size:
+                stats._evict(self._mem[self._ptr])
+            stats._push(arg)
         self._mem[self._ptr] = arg
         self._increment_ptr()
     
@@ -154,6 +486,8 @@ class RotatingBufferList:
         self._decrement_ptr()
         item = self._mem[self._ptr]
         self._mem[self._ptr] = self.filler
+        if self._stats is not None and self._stats.count:
+            self._stats._pop(item)
         return item
     
     def __len__(self):
@@ -182,8 +516,11 @@ class RotatingBufferList:
             stop = index.stop if index.stop is not None else \
                     -1 if step < 0 else \
                     self._size
+            if step == 1:
+                return self._read(start, stop - start)
+            ordered = self._ordered()
             return [
-                self.__getitem__(i) 
+                ordered[i % self._size] 
                 for i in range(start, stop, step)
             ]
         
@@ -192,7 +529,518 @@ class RotatingBufferList:
         )]
 
     def __repr__(self):
-        return f"[{', '.join([item.__repr__() for item in self])}]"
+        return f"[{', '.join([item.__repr__() for item in self._ordered()])}]"
+
+
+def _numpy():
+    """
+    numpy module, None if it's not installed
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class TypedRotatingBufferList(RotatingBufferList):
+    """
+    RotatingBufferList of numbers held in a typed buffer:
+    an array.array of :param typecode: (backend "array")
+    or a numpy ndarray of dtype :param typecode: (backend "numpy").
+    Reads (extract, slices) return arrays of the backend, 
+    :method windows: exposes the contents without copying them
+    and the aggregates are vectorized when numpy is installed.
+    The aggregates are computed over the items that are not empty
+    (see :property occupancy:), skipping nan,
+    the default filler is nan for floats and 0 for integers.
+    """
+    def __init__(
+        self, 
+        size : int, 
+        initial_value : Iterable = (), 
+        typecode : str = 'd', 
+        filler = None, 
+        backend : str = "array",
+        track_stats : bool = False
+    ):
+        if backend not in ("array", "numpy"):
+            raise ValueError(f"Unknown backend {backend}, expected 'array' or 'numpy'")
+        if backend == "numpy" and _numpy() is None:
+            raise ImportError("numpy backend requires numpy to be installed")
+        self.typecode = typecode
+        self.backend = backend
+        if filler is None:
+            filler = nan if self._is_float() else 0
+        super().__init__(size, initial_value, filler, track_stats)
+    
+    def _is_float(self):
+        if self.backend == "numpy":
+            return _numpy().dtype(self.typecode).kind == 'f'
+        return self.typecode in 'fd'
+    
+    def _alloc(self, size, filler):
+        if self.backend == "numpy":
+            return _numpy().full(size, filler, dtype = self.typecode)
+        return array(self.typecode, [filler]) * size
+    
+    def _coerce(self, items):
+        if self.backend == "numpy":
+            return _numpy().asarray(items, dtype = self.typecode)
+        if isinstance(items, array) and items.typecode == self.typecode:
+            return items
+        return array(self.typecode, items)
+    
+    def _join(self, a, b):
+        if self.backend == "numpy":
+            return _numpy().concatenate((a, b))
+        return a + b
+    
+    def _repeat(self, a, n):
+        if self.backend == "numpy":
+            return _numpy().tile(a, n)
+        return a * n
+    
+    def _copy(self, a):
+        # numpy slices are views, they would follow the later writes
+        if self.backend == "numpy":
+            return a.copy()
+        return a
+    
+    def _is_filler(self, item):
+        if isinstance(self.filler, float) and isnan(self.filler):
+            return item != item
+        return item == self.filler
+    
+    def _extend(self, iterable):
+        np = _numpy()
+        if self._stats is None and (
+                isinstance(iterable, (array, memoryview)) or 
+                np is not None and isinstance(iterable, np.ndarray)):
+            # buffers are written in bulk, without iterating them
+            self._write(self._coerce(iterable))
+            return
+        super()._extend(iterable)
+    
+    def windows(self):
+        """
+        Two zero-copy memoryviews over the buffer memory: 
+        the eldest items then the newest ones,
+        together they are the ordered contents.
+        They follow the later writes, copy them to keep the values
+        """
+        first = self._first_index()
+        view = memoryview(self._mem)
+        return view[first:], view[:first]
+    
+    def values(self):
+        """
+        Non empty items in order, without nan, as an array of the backend
+        """
+        occupied = self._occupied()
+        if not self._is_float():
+            return occupied
+        if self.backend == "numpy":
+            return occupied[~_numpy().isnan(occupied)]
+        return array(self.typecode, (x for x in occupied if x == x))
+    
+    def _vector(self):
+        """
+        Non empty items without nan as a numpy array, 
+        None without numpy
+        """
+        np = _numpy()
+        if np is None:
+            return None
+        data = np.asarray(self._occupied())
+        return data[~np.isnan(data)] if self._is_float() else data
+    
+    def mean(self):
+        """
+        Mean of the non empty items, nan if there are none
+        """
+        data = self._vector()
+        if data is not None:
+            return float(data.mean()) if len(data) else nan
+        values = self.values()
+        return fsum(values) / len(values) if len(values) else nan
+    
+    def min(self):
+        """
+        Minimum of the non empty items, raises ValueError if there are none
+        """
+        data = self._vector()
+        values = self.values() if data is None else data
+        if not len(values):
+            raise ValueError("min() of an empty buffer")
+        return min(values) if data is None else data.min().item()
+    
+    def max(self):
+        """
+        Maximum of the non empty items, raises ValueError if there are none
+        """
+        data = self._vector()
+        values = self.values() if data is None else data
+        if not len(values):
+            raise ValueError("max() of an empty buffer")
+        return max(values) if data is None else data.max().item()
+    
+    def percentile(self, q):
+        """
+        Percentile :param q: (0 to 100, or a sequence of them) of the non empty items,
+        linearly interpolated like numpy.percentile, nan if there are none
+        """
+        data = self._vector()
+        if data is not None:
+            if not len(data):
+                return nan if isinstance(q, (int, float)) else [nan for _ in q]
+            result = _numpy().percentile(data, q)
+            return float(result) if isinstance(q, (int, float)) else result.tolist()
+        values = sorted(self.values())
+        
+        def one(q):
+            if not 0 <= q <= 100:
+                raise ValueError("Percentiles must be in the range [0, 100]")
+            if not values:
+                return nan
+            rank = (len(values) - 1) * q / 100
+            low = int(rank)
+            high = min(low + 1, len(values) - 1)
+            return values[low] + (values[high] - values[low]) * (rank - low)
+        
+        return one(q) if isinstance(q, (int, float)) else [one(x) for x in q]
+    
+    def __repr__(self):
+        return repr(self._ordered().tolist())
+
+
+class BufferOverrun(Exception):
+    """
+    Raised by :method SpscRotatingBufferList.get: when the writer
+    replaced items before they were read, :attr lost: is their number.
+    Reading goes on from the eldest item still in the buffer
+    """
+    def __init__(self, lost : int):
+        super().__init__(f"{lost} items were overwritten before being read")
+        self.lost = lost
+
+
+class SpscRotatingBufferList(RotatingBufferList):
+    """
+    RotatingBufferList shared by one writer thread (push, append, extend)
+    and one reader thread (get, snapshot, iteration), without locks.
+    The writer announces the items it's going to write (:attr _reserved:),
+    writes them, then publishes them (:attr _written:):
+    the reader compares both counters around its copies, and drops
+    the items that may have been replaced while it was reading.
+    The pointer and the clock derive from the published counter.
+    Items can't be popped, and stats aren't tracked
+    """
+    def __init__(self, size : int, initial_value : Iterable = (), filler = None):
+        self.filler = filler
+        self._size = size
+        self._mem = self._alloc(size, filler)
+        self._stats = None
+        self._reserved = 0
+        self._written = 0
+        self._cursor = 0
+        self._waiting = False
+        self._event = Event()
+        self.extend(initial_value)
+        # the initial items that fit are there to be read
+        self._cursor = max(0, self._written - size)
+    
+    @property
+    def _ptr(self):
+        return self._written % self._size
+    
+    @property
+    def _clock(self):
+        return self._written // self._size
+    
+    @property
+    def _count(self):
+        return min(self._written, self._size)
+    
+    def _publish(self, written):
+        self._written = written
+        if self._waiting:
+            self._event.set()
+    
+    def _append(self, arg):
+        written = self._written
+        self._reserved = written + 1
+        self._mem[written % self._size] = arg
+        self._publish(written + 1)
+    
+    def _write(self, items):
+        total = len(items)
+        if not total:
+            return
+        written = self._written
+        self._reserved = written + total
+        size = self._size
+        ptr, n = written % size, total
+        if n > size:
+            # only the last items, the eldest on the new pointer
+            items = items[n - size:]
+            ptr, n = (written + n) % size, size
+        items = self._coerce(items)
+        end = ptr + n
+        if end <= size:
+            self._mem[ptr:end] = items
+        else:
+            self._mem[ptr:] = items[:size - ptr]
+            self._mem[:end - size] = items[size - ptr:]
+        self._publish(written + total)
+    
+    def _pop(self):
+        raise TypeError("Items can't be popped from a SpscRotatingBufferList")
+    
+    def clear(self):
+        raise TypeError("A SpscRotatingBufferList can't be cleared")
+    
+    def fill(self, with_, force = False):
+        raise TypeError("A SpscRotatingBufferList can't be filled")
+    
+    def snapshot(self):
+        """
+        Consistent copy of the published items, eldest first.
+        The eldest ones are dropped if the writer 
+        replaced them during the copy
+        """
+        size = self._size
+        written = self._written
+        first = max(0, written - size)
+        start = first % size
+        end = start + written - first
+        if end <= size:
+            items = self._mem[start:end]
+        else:
+            items = self._join(self._mem[start:], self._mem[:end - size])
+        torn = self._reserved - size - first
+        return items[torn:] if torn > 0 else items
+    
+    def get(self, timeout : float = None):
+        """
+        Next unread item, waiting up to :param timeout: seconds
+        (forever if None) for the writer to publish one.
+        Raises queue.Empty on timeout, and :class BufferOverrun: 
+        if unread items have been replaced
+        """
+        size = self._size
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            cursor = self._cursor
+            if cursor < self._written:
+                item = self._mem[cursor % size]
+                # the slot may have been rewritten before or during the read
+                oldest = self._reserved - size
+                if cursor < oldest:
+                    self._cursor = oldest
+                    raise BufferOverrun(oldest - cursor)
+                self._cursor = cursor + 1
+                return item
+            self._event.clear()
+            self._waiting = True
+            try:
+                # publishing before the flag was set is seen here
+                if cursor < self._written:
+                    continue
+                remaining = None if deadline is None else deadline - monotonic()
+                if remaining is not None and remaining <= 0 or \
+                        not self._event.wait(remaining):
+                    raise Empty
+            finally:
+                self._waiting = False
+    
+    def __iter__(self):
+        """
+        Iterate over a :method snapshot:
+        """
+        return iter(self.snapshot())
+    
+    def __repr__(self):
+        return repr(list(self.snapshot()))
+
+
+class _MmapSlots:
+    """
+    Sequence of the records of a :class MmapRotatingBufferList: file,
+    each one a 4 bytes length then the encoded item (0xFFFFFFFF for the filler).
+    Used as the buffer memory, slices are lists of items
+    """
+    EMPTY = 0xFFFFFFFF
+    LENGTH = struct.Struct("<I")
+    
+    def __init__(self, rbl : "MmapRotatingBufferList"):
+        self._rbl = rbl
+    
+    def __len__(self):
+        return self._rbl._size
+    
+    def _offset(self, i):
+        rbl = self._rbl
+        if not -rbl._size <= i < rbl._size:
+            raise IndexError("record index out of range")
+        return MmapRotatingBufferList.HEADER.size + (i % rbl._size) * rbl.record_size
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._rbl._size))]
+        rbl = self._rbl
+        offset = self._offset(index)
+        length, = self.LENGTH.unpack_from(rbl._mm, offset)
+        if length == self.EMPTY:
+            return rbl.filler
+        start = offset + self.LENGTH.size
+        return rbl.decode(rbl._mm[start:start + length])
+    
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            indexes = range(*index.indices(self._rbl._size))
+            items = list(item)
+            if len(items) != len(indexes):
+                raise ValueError("records can't be added or removed")
+            for i, itm in zip(indexes, items):
+                self[i] = itm
+            return
+        rbl = self._rbl
+        offset = self._offset(index)
+        if rbl._is_filler(item):
+            self.LENGTH.pack_into(rbl._mm, offset, self.EMPTY)
+            return
+        data = rbl.encode(item)
+        if len(data) > rbl.record_size - self.LENGTH.size:
+            raise ValueError(
+                f"Encoded item is {len(data)} bytes, "
+                f"records hold {rbl.record_size - self.LENGTH.size}"
+            )
+        # the length goes last: an interrupted write leaves an empty record
+        self.LENGTH.pack_into(rbl._mm, offset, self.EMPTY)
+        start = offset + self.LENGTH.size
+        rbl._mm[start:start + len(data)] = data
+        self.LENGTH.pack_into(rbl._mm, offset, len(data))
+
+
+class MmapRotatingBufferList(RotatingBufferList):
+    """
+    RotatingBufferList persisted in the file at :param path:, memory-mapped:
+    a header (magic, version, size, record size, pointer, clock, occupancy)
+    then :param size: records of :param record_size: bytes,
+    an append writes one record then the header.
+    Items are encoded with :param encode: (to bytes) and decoded
+    with :param decode:, json by default.
+    An existing file is reopened as it is, in O(1), 
+    size and record size come from its header.
+    Writes reach the OS right away (so they survive the process),
+    :method sync: flushes them to disk
+    """
+    MAGIC = b"RBLM"
+    # 2: the occupancy count joined the position, moving the records
+    VERSION = 2
+    HEADER = struct.Struct("<4sIQQqqq")
+    POSITION = struct.Struct("<qqq")
+    POSITION_OFFSET = 24
+    
+    def __init__(
+        self, 
+        path : str, 
+        size : int = None, 
+        initial_value : Iterable = (), 
+        filler = None, 
+        record_size : int = 256,
+        encode : Callable = None,
+        decode : Callable = None
+    ):
+        self.path = path
+        self.filler = filler
+        self.encode = encode or (lambda item: json.dumps(item).encode())
+        self.decode = decode or (lambda data: json.loads(bytes(data)))
+        self._stats = None
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if not exists and size is None:
+            raise ValueError(f"size is required to create {path}")
+        self._file = open(path, "r+b" if exists else "w+b")
+        try:
+            if exists:
+                self._open(size)
+            else:
+                self._create(size, record_size)
+        except BaseException:
+            self._file.close()
+            raise
+        self._mem = _MmapSlots(self)
+        self.extend(initial_value)
+    
+    def _create(self, size, record_size):
+        if record_size <= _MmapSlots.LENGTH.size:
+            raise ValueError(f"record_size must be greater than {_MmapSlots.LENGTH.size}")
+        self._size = size
+        self.record_size = record_size
+        empty = _MmapSlots.LENGTH.pack(_MmapSlots.EMPTY).ljust(record_size, b"\0")
+        self._file.write(self.HEADER.pack(self.MAGIC, self.VERSION, size, record_size, 0, 0, 0))
+        for _ in range(size):
+            self._file.write(empty)
+        self._file.flush()
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+    
+    def _open(self, size):
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, version, self._size, self.record_size, _, _, _ = \
+            self.HEADER.unpack_from(self._mm)
+        if magic != self.MAGIC:
+            self._mm.close()
+            raise ValueError(f"{self.path} is not a rotating buffer file")
+        if version != self.VERSION:
+            self._mm.close()
+            raise ValueError(f"{self.path} is a version {version} rotating buffer file, expected {self.VERSION}")
+        if size is not None and size != self._size:
+            self._mm.close()
+            raise ValueError(f"{self.path} holds {self._size} records, not {size}")
+        ptr, _, count = self.POSITION.unpack_from(self._mm, self.POSITION_OFFSET)
+        if not (0 <= ptr < self._size and 0 <= count <= self._size):
+            self._mm.close()
+            raise ValueError(f"{self.path} has a corrupted position (ptr {ptr}, count {count})")
+    
+    @property
+    def _ptr(self):
+        return self.POSITION.unpack_from(self._mm, self.POSITION_OFFSET)[0]
+    
+    @property
+    def _clock(self):
+        return self.POSITION.unpack_from(self._mm, self.POSITION_OFFSET)[1]
+    
+    @property
+    def _count(self):
+        return self.POSITION.unpack_from(self._mm, self.POSITION_OFFSET)[2]
+    
+    def _set_position(self, ptr, clock, count):
+        # written after the records, but not atomically (24 bytes): a crash
+        # mid-write can leave a mix of old and new fields, out of range values 
+        # are rejected by _open, in range ones point at stale records
+        self.POSITION.pack_into(self._mm, self.POSITION_OFFSET, ptr, clock, count)
+    
+    def sync(self):
+        """
+        Flush the records and the header to disk
+        """
+        self._mm.flush()
+    
+    def close(self):
+        """
+        Flush and close the file, the buffer can't be used anymore
+        """
+        if not self._mm.closed:
+            self._mm.flush()
+            self._mm.close()
+        self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
 
 
 class Pointer:
@@ -253,7 +1101,7 @@ n_things_todo = 10
 fixed_size_lifo = RotatingBufferList(n_things_todo, todos)
 for _ in fixed_size_lifo:
   print("you have done " + fixed_size_lifo.pop()['id'])
-  print(f"only {len(fixed_size_lifo.non_empty_items())} things to do")
+  print(f"only {fixed_size_lifo.occupancy} things to do")
   
 
 ###
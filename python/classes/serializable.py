@@ -1,7 +1,14 @@
+import io
+import sys
 import json
+import codecs
+import struct
+from array import array
 from copy import deepcopy
+from keyword import iskeyword
+from itertools import islice
 from collections import OrderedDict
-from typing import Dict, Callable, TypedDict, Any, Type, List, Union, Literal
+from typing import Dict, Callable, TypedDict, Any, Type, List, Union, Literal, Iterable, Iterator, IO, Optional
 
 # from marshmallow import Schema as MarshmallowSchema
 SchemaType    = Any # MarshmallowSchema
@@ -12,6 +19,322 @@ class SerializingMapping(TypedDict):
     cls: Dict[Type[Any], Callable[[Any], Any]]
 
 NestedMapping = Dict[str, Union[Type["Serializable"], Literal["self"]]]
+JsonFormat    = Literal["jsonl", "array"]
+
+
+# JSON backends (stdlib json unless set_json_backend is called)
+# each returns (dumps, loads, the exceptions on which to retry with the stdlib)
+def _orjson():
+    import orjson
+    return orjson.dumps, orjson.loads, (TypeError, ValueError)
+
+def _ujson():
+    import ujson
+    return (
+        lambda o: ujson.dumps(o, escape_forward_slashes=False),
+        ujson.loads,
+        (TypeError, ValueError, OverflowError)
+    )
+
+def _msgspec():
+    import msgspec
+    return msgspec.json.encode, msgspec.json.decode, (TypeError, ValueError, msgspec.MsgspecError)
+
+JSON_BACKENDS: Dict[str, Callable[[], tuple]] = {
+    "orjson" : _orjson,
+    "ujson"  : _ujson,
+    "msgspec": _msgspec,
+}
+_STDLIB_JSON = ("json", None, None, ())
+_json_backend = _STDLIB_JSON
+
+def set_json_backend(name: Optional[str] = None) -> str:
+    """
+    Use the JSON backend name ("orjson", "ujson", "msgspec" or "json" for
+    the stdlib), or the first one installed if name is None. 
+    Returns the name of the backend in use.
+    The stdlib is the default: the others write compact JSON and may 
+    differ on edge cases (eg orjson writes NaN and Infinity as null).
+    Classes with a json_encoder or a json_decoder always use the stdlib
+    """
+    global _json_backend
+    names = list(JSON_BACKENDS) if name is None else [name]
+    for n in names:
+        if n == "json":
+            break
+        if n not in JSON_BACKENDS:
+            raise ValueError(f"Unknown JSON backend {n}")
+        try:
+            _json_backend = (n, *JSON_BACKENDS[n]())
+            return n
+        except ImportError:
+            if name is not None:
+                raise
+    _json_backend = _STDLIB_JSON
+    return "json"
+
+def _dumps(o, encoder: json.JSONEncoder = None) -> str:
+    _, dumps, _, errors = _json_backend
+    if dumps is not None and encoder is None:
+        try:
+            s = dumps(o)
+            return s.decode() if isinstance(s, bytes) else s
+        except errors:
+            # stdlib json tells if o is really not serializable
+            pass
+    return json.dumps(o, cls=encoder)
+
+def _loads(s: Union[str, bytes], decoder: json.JSONDecoder = None):
+    _, _, loads, errors = _json_backend
+    if loads is not None and decoder is None:
+        try:
+            return loads(s)
+        except errors:
+            pass
+    return json.loads(s, cls=decoder)
+
+# MessagePack (msgpack if installed, the built-in encoder otherwise)
+_msgpack_backend = None
+
+def _msgpack():
+    global _msgpack_backend
+    if _msgpack_backend is None:
+        try:
+            import msgpack
+            _msgpack_backend = (
+                lambda o: msgpack.packb(o, use_bin_type=True),
+                lambda b: msgpack.unpackb(b, raw=False, strict_map_key=False),
+            )
+        except ImportError:
+            _msgpack_backend = (_mp_pack, _mp_unpack)
+    return _msgpack_backend
+
+def _mp_pack(o) -> bytes:
+    """
+    MessagePack encoding of None, bools, ints (64 bits), floats, str, bytes, 
+    lists, tuples and dicts
+    """
+    out = []
+    _mp_write(o, out.append)
+    return b"".join(out)
+
+def _mp_write(o, write):
+    pack = struct.pack
+    if o is None:
+        write(b"\xc0")
+    elif o is True:
+        write(b"\xc3")
+    elif o is False:
+        write(b"\xc2")
+    elif isinstance(o, int):
+        if 0 <= o < 0x80:
+            write(pack("B", o))
+        elif -32 <= o < 0:
+            write(pack("b", o))
+        elif 0 <= o <= 0xFFFFFFFFFFFFFFFF:
+            for limit, head, fmt in ((0xFF, 0xcc, ">B"), (0xFFFF, 0xcd, ">H"), (0xFFFFFFFF, 0xce, ">I")):
+                if o <= limit:
+                    write(bytes((head,)) + pack(fmt, o))
+                    break
+            else:
+                write(b"\xcf" + pack(">Q", o))
+        elif -(1 << 63) <= o < 0:
+            for limit, head, fmt in ((1 << 7, 0xd0, ">b"), (1 << 15, 0xd1, ">h"), (1 << 31, 0xd2, ">i")):
+                if o >= -limit:
+                    write(bytes((head,)) + pack(fmt, o))
+                    break
+            else:
+                write(b"\xd3" + pack(">q", o))
+        else:
+            raise OverflowError(f"Integer {o} doesn't fit in 64 bits")
+    elif isinstance(o, float):
+        write(b"\xcb" + pack(">d", o))
+    elif isinstance(o, str):
+        data = o.encode()
+        _mp_head(len(data), 0xa0, 32, (0xd9, 0xda, 0xdb), write)
+        write(data)
+    elif isinstance(o, (bytes, bytearray, memoryview)):
+        data = bytes(o)
+        _mp_head(len(data), None, 0, (0xc4, 0xc5, 0xc6), write)
+        write(data)
+    elif isinstance(o, (list, tuple)):
+        _mp_head(len(o), 0x90, 16, (None, 0xdc, 0xdd), write)
+        for item in o:
+            _mp_write(item, write)
+    elif isinstance(o, dict):
+        _mp_head(len(o), 0x80, 16, (None, 0xde, 0xdf), write)
+        for k, v in o.items():
+            _mp_write(k, write)
+            _mp_write(v, write)
+    else:
+        raise TypeError(f"Object of type {o.__class__.__name__} is not MessagePack serializable")
+
+def _mp_head(n: int, fix: Optional[int], fix_limit: int, heads: tuple, write):
+    """
+    Header of a str / bin / array / map of n items: fix format if n < fix_limit,
+    else the first of heads (8, 16, 32 bits lengths) that fits
+    """
+    if fix is not None and n < fix_limit:
+        write(bytes((fix | n,)))
+        return
+    for head, fmt, limit in zip(heads, (">B", ">H", ">I"), (0xFF, 0xFFFF, 0xFFFFFFFF)):
+        if head is not None and n <= limit:
+            write(bytes((head,)) + struct.pack(fmt, n))
+            return
+    raise OverflowError(f"{n} items can't be MessagePack encoded")
+
+# fixed size formats: first byte -> (struct format, size)
+_MP_FIXED = {
+    0xcc: (">B", 1), 0xcd: (">H", 2), 0xce: (">I", 4), 0xcf: (">Q", 8),
+    0xd0: (">b", 1), 0xd1: (">h", 2), 0xd2: (">i", 4), 0xd3: (">q", 8),
+    0xca: (">f", 4), 0xcb: (">d", 8),
+}
+# sized formats: first byte -> (kind, struct format of the length, its size)
+_MP_SIZED = {
+    0xd9: ("str", ">B", 1), 0xda: ("str", ">H", 2), 0xdb: ("str", ">I", 4),
+    0xc4: ("bin", ">B", 1), 0xc5: ("bin", ">H", 2), 0xc6: ("bin", ">I", 4),
+    0xdc: ("array", ">H", 2), 0xdd: ("array", ">I", 4),
+    0xde: ("map", ">H", 2), 0xdf: ("map", ">I", 4),
+}
+
+def _mp_unpack(data: bytes):
+    """
+    Decode MessagePack data (without extension types)
+    """
+    data = bytes(data)
+    o, end = _mp_read(data, 0)
+    if end != len(data):
+        raise ValueError(f"Extra data after MessagePack object at byte {end}")
+    return o
+
+def _mp_read(data: bytes, i: int) -> tuple:
+    try:
+        b = data[i]
+    except IndexError:
+        raise ValueError("Truncated MessagePack data") from None
+    i += 1
+    if b < 0x80:
+        return b, i
+    if b >= 0xe0:
+        return b - 0x100, i
+    if 0xa0 <= b < 0xc0:
+        kind, n = "str", b & 0x1f
+    elif 0x90 <= b < 0xa0:
+        kind, n = "array", b & 0x0f
+    elif 0x80 <= b < 0x90:
+        kind, n = "map", b & 0x0f
+    elif b == 0xc0:
+        return None, i
+    elif b == 0xc2:
+        return False, i
+    elif b == 0xc3:
+        return True, i
+    elif b in _MP_FIXED:
+        fmt, size = _MP_FIXED[b]
+        if i + size > len(data):
+            raise ValueError("Truncated MessagePack data")
+        return struct.unpack_from(fmt, data, i)[0], i + size
+    elif b in _MP_SIZED:
+        kind, fmt, size = _MP_SIZED[b]
+        if i + size > len(data):
+            raise ValueError("Truncated MessagePack data")
+        n, = struct.unpack_from(fmt, data, i)
+        i += size
+    else:
+        raise ValueError(f"Unsupported MessagePack type 0x{b:02x}")
+    if kind in ("str", "bin"):
+        if i + n > len(data):
+            raise ValueError("Truncated MessagePack data")
+        chunk = data[i:i + n]
+        return (chunk.decode() if kind == "str" else chunk), i + n
+    if kind == "array":
+        items = []
+        for _ in range(n):
+            item, i = _mp_read(data, i)
+            items.append(item)
+        return items, i
+    d = {}
+    for _ in range(n):
+        k, i = _mp_read(data, i)
+        d[k], i = _mp_read(data, i)
+    return d, i
+
+
+# Positional rows (values in the order of the fields, nested objects as rows)
+def _positional(cls) -> bool:
+    return not cls._Serializable__schema and bool(cls._Serializable__fields)
+
+def _row_plan(cls, plans: dict):
+    """
+    (serialized key, nested class or None) of each field of cls, 
+    None if cls isn't positional; memoized in plans for a batch of rows
+    """
+    try:
+        return plans[cls]
+    except KeyError:
+        pass
+    plan = None
+    if _positional(cls):
+        nested = cls._Serializable__nested
+        plan = [
+            (cls.field_maps_to(field), nested.get(field) or None) 
+            for field in cls._Serializable__fields
+        ]
+    plans[cls] = plan
+    return plan
+
+def _dict_to_row(cls, d: dict, plans: dict = None):
+    plans = {} if plans is None else plans
+    plan = _row_plan(cls, plans)
+    if plan is None:
+        return d
+    row = []
+    for key, sub in plan:
+        v = d[key]
+        if v is not None and sub is not None:
+            v = _dict_to_row(sub, v, plans)
+        row.append(v)
+    return row
+
+def _row_to_dict(cls, row, plans: dict = None) -> dict:
+    if isinstance(row, dict):
+        return row
+    plans = {} if plans is None else plans
+    d = {}
+    for (key, sub), v in zip(_row_plan(cls, plans), row):
+        if v is not None and sub is not None:
+            v = _row_to_dict(sub, v, plans)
+        d[key] = v
+    return d
+
+# Packed columns: all ints that fit 64 bits, or all floats
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+def _packed_typecode(column: list) -> str:
+    if column and all(type(v) is float for v in column):
+        return "d"
+    if column and all(type(v) is int for v in column) and \
+            -(1 << 63) <= min(column) and max(column) < (1 << 63):
+        return "q"
+    return ""
+
+def _pack_column(column: list, typecode: str):
+    if not typecode:
+        return column
+    packed = array(typecode, column)
+    if not _LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+def _unpack_column(column, typecode: str) -> list:
+    if not typecode:
+        return column
+    packed = array(typecode)
+    packed.frombytes(column)
+    if not _LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tolist()
+
 
 # Class Decorator (will make the class inherit from Serializable, if it's not)
 def serializable(
@@ -64,6 +387,7 @@ def serializable(
             cls._Serializable__field_mapping_r = {
                 v: k for k, v in cls._Serializable__field_mapping.items()
             }
+            _uncompile(cls)
             return cls
             
         cls._Serializable__fields.extend(fields)
@@ -87,10 +411,102 @@ def serializable(
             v: k for k, v in cls._Serializable__field_mapping.items()
         }
         
+        _compile(cls)
         return cls
     return wrapped
 
 
+# Code generation (specialized _to_dict / _from_dict for decorated classes)
+def _compilable(cls, method: str) -> bool:
+    """
+    Generated methods only replace the generic ones (or previously generated ones)
+    """
+    current = getattr(cls, method)
+    current = getattr(current, "__func__", current)
+    generic = getattr(Serializable, method)
+    return (
+        current is getattr(generic, "__func__", generic) or 
+        getattr(current, "_serializable_compiled", False)
+    )
+
+def _uncompile(cls):
+    """
+    Go back to the generic methods (for schemas and fallbacks)
+    """
+    for method in ("_to_dict", "_from_dict"):
+        if _compilable(cls, method):
+            setattr(cls, method, Serializable.__dict__[method])
+
+def _compile(cls):
+    """
+    Generate a _to_dict and a _from_dict for cls with its fields, mappings, 
+    nested classes and key strategies inlined (serializers and deserializers
+    by key are read once, when decorating), falls back to the generic methods
+    for field names that aren't identifiers or an overridden field_maps_to
+    """
+    fields = cls._Serializable__fields
+    if (
+            any(not f.isidentifier() or iskeyword(f) for f in fields) or
+            cls.field_maps_to.__func__ is not Serializable.field_maps_to.__func__
+        ):
+        _uncompile(cls)
+        return
+    
+    nested = cls._Serializable__nested
+    serializers = cls._Serializable__serializers
+    deserializers = cls._Serializable__deserializers
+    namespace = {
+        "_ser_cls": serializers["cls"].get,
+        "_deser_cls": deserializers["cls"].get,
+    }
+    to_items, from_items = [], []
+    for i, field in enumerate(fields):
+        key = repr(cls.field_maps_to(field))
+        
+        if field in nested:
+            to_value = f"None if (v := self.{field}) is None else v._to_dict()"
+        elif serializers["key"].get(field):
+            namespace[f"_ser_{i}"] = serializers["key"][field]
+            to_value = f"_ser_{i}(self.{field})"
+        elif serializers["cls"]:
+            to_value = (
+                f"v if (s := _ser_cls((v := self.{field}).__class__)) is None else s(v)"
+            )
+        else:
+            to_value = f"self.{field}"
+        to_items.append(f"        {key}: {to_value},")
+        
+        if nested.get(field):
+            namespace[f"_nested_{i}"] = nested[field]
+            from_value = f"None if (v := d[{key}]) is None else _nested_{i}.deserialize(v)"
+        elif deserializers["key"].get(field):
+            namespace[f"_deser_{i}"] = deserializers["key"][field]
+            from_value = f"_deser_{i}(d[{key}])"
+        elif deserializers["cls"]:
+            from_value = f"v if (s := _deser_cls((v := d[{key}]).__class__)) is None else s(v)"
+        else:
+            from_value = f"d[{key}]"
+        from_items.append(f"        {field!r}: {from_value},")
+    
+    source = "\n".join([
+        "def _to_dict(self):",
+        "    return {",
+        *to_items,
+        "    }",
+        "def _from_dict(cls, d):",
+        "    return {",
+        *from_items,
+        "    }",
+    ])
+    exec(compile(source, f"<serializable {cls.__qualname__}>", "exec"), namespace)
+    for method in ("_to_dict", "_from_dict"):
+        func = namespace[method]
+        func._serializable_compiled = True
+        func.__qualname__ = f"{cls.__qualname__}.{method}"
+        if _compilable(cls, method):
+            setattr(cls, method, classmethod(func) if method == "_from_dict" else func)
+
+
 # Implementation
 class Serializable:
     """
@@ -181,16 +597,16 @@ class Serializable:
         }
     
     def _to_json(self) -> str:
-        return json.dumps(
+        return _dumps(
             self.to_dict(), 
-            cls=self._Serializable__json_encoder
+            self._Serializable__json_encoder
         )
     
     @classmethod
     def _from_json(cls, s: str):
-        return cls.from_dict(json.loads(
+        return cls.from_dict(_loads(
             s,
-            cls=cls._Serializable__json_decoder
+            cls._Serializable__json_decoder
         ))
     
     @classmethod
@@ -228,10 +644,190 @@ class Serializable:
         return cls.from_dict(d)
 
     @classmethod
-    def serialize_many(objs):
+    def serialize_many(cls, objs):
         return list(map(lambda o: o.serialize(), objs))
     
     @classmethod
     def deserialize_many(cls, dicts: List[dict]):
         return list(map(cls.deserialize, dicts))
+    
+    def to_msgpack(self) -> bytes:
+        """
+        MessagePack encoding of the serialized object, positional:
+        an array of the values in the order of the fields (nested objects too),
+        a map of the serialized dict for schemas
+        """
+        packb, _ = _msgpack()
+        return packb(_dict_to_row(self.__class__, self.to_dict()))
+    
+    @classmethod
+    def from_msgpack(cls, data: bytes):
+        _, unpackb = _msgpack()
+        return cls.from_dict(_row_to_dict(cls, unpackb(data)))
+    
+    @classmethod
+    def to_msgpack_columns(cls, objs: Iterable["Serializable"]) -> bytes:
+        """
+        Columnar MessagePack encoding of homogeneous objs (instances of cls): 
+        [serialized field names, column typecodes, columns], 
+        int64 and float64 columns are packed little-endian in a bin 
+        (typecode "q" or "d"), the others are arrays (typecode "")
+        """
+        packb, _ = _msgpack()
+        if not _positional(cls):
+            return packb([None, None, [o.to_dict() for o in objs]])
+        keys = list(map(cls.field_maps_to, cls._Serializable__fields))
+        plans = {}
+        rows = [_dict_to_row(cls, o.to_dict(), plans) for o in objs]
+        columns = [list(column) for column in zip(*rows)] if rows else [[] for _ in keys]
+        typecodes = list(map(_packed_typecode, columns))
+        return packb([
+            keys, 
+            typecodes, 
+            list(map(_pack_column, columns, typecodes)),
+        ])
+    
+    @classmethod
+    def from_msgpack_columns(cls, data: bytes) -> list:
+        """
+        Objects from :method to_msgpack_columns:, matching the columns 
+        to the fields by their serialized names
+        """
+        _, unpackb = _msgpack()
+        keys, typecodes, columns = unpackb(data)
+        if keys is None:
+            return list(map(cls.from_dict, columns))
+        columns = list(map(_unpack_column, columns, typecodes))
+        by_key = dict(zip(keys, columns))
+        own_keys = list(map(cls.field_maps_to, cls._Serializable__fields))
+        missing = [k for k in own_keys if k not in by_key]
+        if missing:
+            raise KeyError(f"Missing columns {missing}")
+        plans = {}
+        return [
+            cls.from_dict(_row_to_dict(cls, row, plans)) 
+            for row in zip(*(by_key[k] for k in own_keys))
+        ]
+    
+    @classmethod
+    def dump_many(
+            cls, 
+            objs   : Iterable["Serializable"], 
+            fp     : IO, 
+            format : JsonFormat = "jsonl",
+            batch  : int        = 1000
+        ) -> int:
+        """
+        Stream objs to the (text or binary) file object fp, as JSON Lines 
+        or as a JSON array, writing batch objects at a time. 
+        Returns the number of objects written
+        """
+        if format not in ("jsonl", "array"):
+            raise ValueError(f"Unknown format {format}, expected 'jsonl' or 'array'")
+        encoder = cls._Serializable__json_encoder
+        binary = _is_binary(fp)
+        write = (lambda s: fp.write(s.encode())) if binary else fp.write
+        separator = "\n" if format == "jsonl" else ",\n"
+        objs = iter(objs)
+        count = 0
+        if format == "array":
+            write("[\n")
+        while chunk := list(islice(objs, batch)):
+            lines = separator.join(_dumps(o.serialize(), encoder) for o in chunk)
+            if format == "jsonl":
+                write(lines + "\n")
+            else:
+                write((separator if count else "") + lines)
+            count += len(chunk)
+        if format == "array":
+            write("\n]\n" if count else "]\n")
+        return count
+    
+    @classmethod
+    def load_many(
+            cls, 
+            fp         : IO, 
+            format     : JsonFormat = "jsonl",
+            chunk_size : int        = 1 << 16
+        ) -> Iterator["Serializable"]:
+        """
+        Generate the objects read from the (text or binary) file object fp,
+        JSON Lines (blank lines are skipped) or a JSON array,
+        without loading the whole file
+        """
+        if format not in ("jsonl", "array"):
+            raise ValueError(f"Unknown format {format}, expected 'jsonl' or 'array'")
+        decoder = cls._Serializable__json_decoder
+        if format == "jsonl":
+            for line in fp:
+                if line.strip():
+                    yield cls.deserialize(_loads(line, decoder))
+            return
+        for d in _iter_json_array(fp, (decoder or json.JSONDecoder)(), chunk_size):
+            yield cls.deserialize(d)
+
+
+def _is_binary(fp: IO) -> bool:
+    """
+    Whether fp takes bytes: io classes tell, wrappers (eg tempfile's) have a mode
+    """
+    if isinstance(fp, io.TextIOBase):
+        return False
+    if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+        return True
+    mode = getattr(fp, "mode", "")
+    return isinstance(mode, str) and "b" in mode
+
+def _iter_json_array(fp: IO, decoder: json.JSONDecoder, chunk_size: int) -> Iterator[Any]:
+    """
+    Generate the items of the JSON array in fp, reading chunk_size at a time
+    and decoding each item with decoder.raw_decode
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buf, pos, eof = "", 0, False
+    
+    def more():
+        nonlocal buf, pos, eof
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        text = isinstance(chunk, str)
+        buf = buf[pos:] + (chunk if text else utf8.decode(chunk, final=eof))
+        pos = 0
+    
+    def skip_ws() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                return ""
+            more()
+    
+    if skip_ws() != "[":
+        raise ValueError("Expected a JSON array")
+    pos += 1
+    if skip_ws() == "]":
+        return
+    while True:
+        skip_ws()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # a value not followed by a delimiter may be cut (eg. numbers)
+                if eof or end < len(buf) and buf[end] in " \t\n\r,]":
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more()
+        pos = end
+        yield item
+        c = skip_ws()
+        if c == "]":
+            return
+        if c != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, got {c!r}")
+        pos += 1
 